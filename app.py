@@ -2,16 +2,16 @@ import re
 import sys
 
 # from pymongo import MongoClient, errors
-from pymilvus import connections, db, exceptions
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeyEvent
 from PyQt5.QtWidgets import QApplication
-from pymongo import MongoClient, errors
+from pymongo import errors
 import requests
 from requests.exceptions import ConnectionError
 
 from src.ai_module import AI
+from src.db_manager import db_manager
 # from src.chartWidgetFunctions import ChartWidgetFunctions
 # from src.registerFunctions import RegisterFunctions
 from src.setupWidgetFunctions import SetupWidgetFunction
@@ -41,13 +41,6 @@ class MainWindow(QtWidgets.QMainWindow):
     @QtCore.pyqtSlot(str)
     def recv_text(self, text):
         try:
-            # conn = connections.connect(host=f'{text}', port=19530)
-            # self.database = db.list_database()
-            # print(self.database)
-            client = MongoClient(f"mongodb://10.37.239.102:9999", serverSelectionTimeoutMS=5000)
-            self.db = client["vehicles_db"]
-            self.db.list_collection_names()
-
             ip_address = self.ui.comboBoxServerIP.currentText()
 
             if ip_address == "":
@@ -71,7 +64,12 @@ class MainWindow(QtWidgets.QMainWindow):
                 )
                 return
 
-            QtWidgets.QMessageBox.information(self, "INFO", "Kết nối database thành công!")
+            # Milvus connects in the background, only MongoDB is waited for
+            db_manager.set_server(ip_address)
+            self.db = db_manager.mongo_db()
+            db_manager.ping_mongo()
+
+            QtWidgets.QMessageBox.information(self, "INFO", "Kết nối server thành công!")
             self.ui.checkButton.setEnabled(False)
 
             self.ui_functions = UIFunctions(self.ui)
@@ -153,9 +151,8 @@ class MainWindow(QtWidgets.QMainWindow):
         if ret == QtWidgets.QMessageBox.Yes:
             if hasattr(self, 'livestream_funcs') and self.livestream_funcs is not None:
                 self.livestream_funcs.remove_all_cameras()
-                self.close()
-            else:
-                self.close()
+            db_manager.close()
+            self.close()
 
 
 if __name__ == '__main__':
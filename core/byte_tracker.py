@@ -3,12 +3,11 @@ from collections import deque
 import os
 import os.path as osp
 import copy
-import torch
-import torch.nn.functional as F
 
 from core.kalman_filter import KalmanFilter
 from core.matching import *
 from core.basetrack import BaseTrack, TrackState
+from core.track_table import TrackTable
 class Args():
     def __init__(self) -> None:
         self.track_thresh = 0.4
@@ -20,81 +19,35 @@ class Args():
         self.tsize = None
         self.exp_file = None
 class STrack(BaseTrack):
-    shared_kalman = KalmanFilter()
-    def __init__(self, tlwh, score):
+    """Read-only snapshot of one track of a BYTETracker, see `from_table`.
 
-        # wait activate
-        self._tlwh = np.asarray(tlwh, dtype=np.float)
-        self.kalman_filter = None
+    The tracker keeps and updates its tracks in a TrackTable, snapshots
+    only expose them to the callers.
+    """
+    def __init__(self, tlwh, score):
+        self._tlwh = np.asarray(tlwh, dtype=np.float64)
         self.mean, self.covariance = None, None
         self.is_activated = False
 
         self.score = score
         self.tracklet_len = 0
-
-    def predict(self):
-        mean_state = self.mean.copy()
-        if self.state != TrackState.Tracked:
-            mean_state[7] = 0
-        self.mean, self.covariance = self.kalman_filter.predict(mean_state, self.covariance)
-
-    @staticmethod
-    def multi_predict(stracks, kalman_filter):
-        if len(stracks) > 0:
-            multi_mean = np.asarray([st.mean.copy() for st in stracks])
-            multi_covariance = np.asarray([st.covariance for st in stracks])
-            for i, st in enumerate(stracks):
-                if st.state != TrackState.Tracked:
-                    multi_mean[i][7] = 0
-            multi_mean, multi_covariance = kalman_filter.multi_predict(multi_mean, multi_covariance)
-            for i, (mean, cov) in enumerate(zip(multi_mean, multi_covariance)):
-                stracks[i].mean = mean
-                stracks[i].covariance = cov
-
-    def activate(self, kalman_filter, frame_id):
-        """Start a new tracklet"""
-        self.kalman_filter = kalman_filter
-        self.track_id = self.next_id()
-        self.mean, self.covariance = self.kalman_filter.initiate(self.tlwh_to_xyah(self._tlwh))
-
-        self.tracklet_len = 0
-        self.state = TrackState.Tracked
-        if frame_id == 1:
-            self.is_activated = True
-        # self.is_activated = True
-        self.frame_id = frame_id
-        self.start_frame = frame_id
-
-    def re_activate(self, new_track, frame_id, new_id=False):
-        self.mean, self.covariance = self.kalman_filter.update(
-            self.mean, self.covariance, self.tlwh_to_xyah(new_track.tlwh)
-        )
-        self.tracklet_len = 0
-        self.state = TrackState.Tracked
-        self.is_activated = True
-        self.frame_id = frame_id
-        if new_id:
-            self.track_id = self.next_id()
-        self.score = new_track.score
-
-    def update(self, new_track, frame_id):
-        """
-        Update a matched track
-        :type new_track: STrack
-        :type frame_id: int
-        :type update_feature: bool
-        :return:
-        """
-        self.frame_id = frame_id
-        self.tracklet_len += 1
-
-        new_tlwh = new_track.tlwh
-        self.mean, self.covariance = self.kalman_filter.update(
-            self.mean, self.covariance, self.tlwh_to_xyah(new_tlwh))
-        self.state = TrackState.Tracked
-        self.is_activated = True
-
-        self.score = new_track.score
+        # class id in class-aware tracking, -1 otherwise
+        self.cls = -1
+
+    @classmethod
+    def from_table(cls, table, row):
+        """Snapshot of one row of a TrackTable"""
+        track = cls(np.zeros(4), table.scores[row])
+        track.track_id = int(table.ids[row])
+        track.state = int(table.states[row])
+        track.is_activated = bool(table.activated[row])
+        track.mean = table.means[row].copy()
+        track.covariance = table.covariances[row].copy()
+        track.frame_id = int(table.frame_ids[row])
+        track.start_frame = int(table.start_frames[row])
+        track.tracklet_len = int(table.tracklet_len[row])
+        track.cls = int(table.classes[row])
+        return track
 
     @property
     # @jit(nopython=True)
@@ -152,10 +105,9 @@ class STrack(BaseTrack):
 
 
 class BYTETracker(object):
-    def __init__(self, frame_rate=22):
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
-        self.removed_stracks = []  # type: list[STrack]
+    def __init__(self, frame_rate=22, max_removed=1000):
+        # Every track lives in one structure-of-arrays table, see core/track_table.py
+        self.tracks = TrackTable(max_removed=max_removed)
 
         self.frame_id = 0
         self.args = Args()
@@ -166,349 +118,187 @@ class BYTETracker(object):
         self.max_time_lost = self.buffer_size
         self.kalman_filter = KalmanFilter()
 
-    def update(self, output_results, img_info, img_size, filter_class):
-        self.frame_id += 1
-        activated_starcks = []
-        refind_stracks = []
-        lost_stracks = []
-        removed_stracks = []
-            
-        if output_results.shape[1] == 5:
-            scores = output_results[:, 4]
-            bboxes = output_results[:, :4]
-            cls = output_results[:, 6]
-            
-        else:
-            # output_results = output_results.cpu().numpy()
-            scores = output_results[:, 4] *output_results[:,5]
-            bboxes = output_results[:, :4]  # x1y1x2y2
-            cls = output_results[:, 5]
-        img_h, img_w = img_info[0], img_info[1]
-        scale = min(img_size[0] / float(img_h), img_size[1] / float(img_w))
-        bboxes /= 1
-
-        remain_inds = scores > self.args.track_thresh
-        inds_low = scores > 0.1
-        inds_high = scores < self.args.track_thresh
+    @property
+    def tracked_stracks(self):
+        return [STrack.from_table(self.tracks, i) for i in self.tracks.where(TrackState.Tracked)]
 
-        inds_second = np.logical_and(inds_low, inds_high)
-        dets_second = bboxes[inds_second]
-        dets = bboxes[remain_inds]
-        # print(dets)
+    @property
+    def lost_stracks(self):
+        return [STrack.from_table(self.tracks, i) for i in self.tracks.where(TrackState.Lost)]
 
-        scores_keep = scores[remain_inds]
-        scores_second = scores[inds_second]
+    @property
+    def removed_stracks(self):
+        """(track_id, start_frame, end_frame) of the last `max_removed` removed tracks"""
+        return list(self.tracks.removed)
+
+    def _iou_cost(self, rows, det_tlbrs, det_scores=None, det_classes=None):
+        """IoU distance between table rows and detection boxes, fused with the
+        detection scores unless running in MOT20 mode. With `det_classes`,
+        pairs of a track and a detection of different classes get the
+        maximum cost so they are never matched."""
+        dists = 1 - ious(self.tracks.tlbr(rows), det_tlbrs)
+        if det_scores is not None and not self.args.mot20 and dists.size:
+            dists = 1 - (1 - dists) * det_scores[None, :]
+        if det_classes is not None and dists.size:
+            dists[self.tracks.classes[rows][:, None] != det_classes[None, :]] = 1.
+        return dists
+
+    def _update_rows(self, rows, det_tlbrs, det_scores):
+        """Kalman-correct matched rows and mark them Tracked.
+
+        Rows that were already Tracked extend their tracklet, lost rows are
+        re-activated with a fresh tracklet.
+        """
+        if len(rows) == 0:
+            return
+        t = self.tracks
+        measurements = det_tlbrs.copy()
+        measurements[:, 2:] -= measurements[:, :2]
+        measurements = np.asarray([STrack.tlwh_to_xyah(m) for m in measurements])
+        t.means[rows], t.covariances[rows] = self.kalman_filter.multi_update(
+            t.means[rows], t.covariances[rows], measurements)
+
+        was_tracked = t.states[rows] == TrackState.Tracked
+        t.tracklet_len[rows] = np.where(was_tracked, t.tracklet_len[rows] + 1, 0)
+        t.states[rows] = TrackState.Tracked
+        t.activated[rows] = True
+        t.frame_ids[rows] = self.frame_id
+        t.scores[rows] = det_scores
+
+    def _step(self, bboxes, scores, cls, filter_class, class_aware=False):
+        """Run one frame of association on the table.
+
+        In `class_aware` mode every track keeps the class of the detection
+        it started from and only matches detections of that class.
+        """
+        t = self.tracks
 
-        if len(dets) > 0:
-            '''Detections'''
-            detections = [STrack(STrack.tlbr_to_tlwh(tlbr), s) for
-                          (tlbr, s,id_cls) in zip(dets, scores_keep,cls) if id_cls in filter_class]
+        remain_inds = scores > self.args.track_thresh
+        inds_second = np.logical_and(scores > 0.1, scores < self.args.track_thresh)
+        if cls is not None:
+            remain_inds &= np.isin(cls, filter_class)
+        dets, scores_keep = bboxes[remain_inds], scores[remain_inds]
+        dets_second, scores_second = bboxes[inds_second], scores[inds_second]
+        if class_aware:
+            cls = cls.astype(np.int64)
+            cls_keep, cls_second = cls[remain_inds], cls[inds_second]
         else:
-            detections = []
+            cls_keep = cls_second = None
 
-        ''' Add newly detected tracklets to tracked_stracks'''
-        unconfirmed = []
-        tracked_stracks = []  # type: list[STrack]
-        for track in self.tracked_stracks:
-            if not track.is_activated:
-                unconfirmed.append(track)
-            else:
-                tracked_stracks.append(track)
+        unconfirmed = t.where(TrackState.Tracked, activated=False)
 
         ''' Step 2: First association, with high score detection boxes'''
-        strack_pool = joint_stracks(tracked_stracks, self.lost_stracks)
+        strack_pool = np.concatenate([t.where(TrackState.Tracked, activated=True), t.where(TrackState.Lost)])
         # Predict the current location with KF
-        STrack.multi_predict(strack_pool, self.kalman_filter)
-        dists = iou_distance(strack_pool, detections)
-        if not self.args.mot20:
-            dists = fuse_score(dists, detections)
+        if len(strack_pool):
+            mean = t.means[strack_pool]
+            mean[t.states[strack_pool] != TrackState.Tracked, 7] = 0
+            t.means[strack_pool], t.covariances[strack_pool] = self.kalman_filter.multi_predict(
+                mean, t.covariances[strack_pool])
+        dists = self._iou_cost(strack_pool, dets, scores_keep, cls_keep)
         matches, u_track, u_detection = linear_assignment(dists, thresh=self.args.match_thresh)
+        if len(matches):
+            self._update_rows(strack_pool[matches[:, 0]], dets[matches[:, 1]], scores_keep[matches[:, 1]])
 
-        for itracked, idet in matches:
-            track = strack_pool[itracked]
-            det = detections[idet]
-            if track.state == TrackState.Tracked:
-                track.update(detections[idet], self.frame_id)
-                activated_starcks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
-
-        ''' Step 3: Second association, with low scor e detection boxes'''
+        ''' Step 3: Second association, with low score detection boxes'''
         # association the untrack to the low score detections
-        if len(dets_second) > 0:
-            '''Detections'''
-            detections_second = [STrack(STrack.tlbr_to_tlwh(tlbr), s) for
-                          (tlbr, s) in zip(dets_second, scores_second)]
-        else:
-            detections_second = []
-        r_tracked_stracks = [strack_pool[i] for i in u_track if strack_pool[i].state == TrackState.Tracked]
-        dists = iou_distance(r_tracked_stracks, detections_second)
-        matches, u_track, u_detection_second =linear_assignment(dists, thresh=0.5)
-        for itracked, idet in matches:
-            track = r_tracked_stracks[itracked]
-            det = detections_second[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_starcks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
-
-        for it in u_track:
-            track = r_tracked_stracks[it]
-            if not track.state == TrackState.Lost:
-                track.mark_lost()
-                lost_stracks.append(track)
+        r_tracked = strack_pool[np.asarray(u_track, dtype=int)]
+        r_tracked = r_tracked[t.states[r_tracked] == TrackState.Tracked]
+        dists = self._iou_cost(r_tracked, dets_second, det_classes=cls_second)
+        matches, u_track, _ = linear_assignment(dists, thresh=0.5)
+        if len(matches):
+            self._update_rows(r_tracked[matches[:, 0]], dets_second[matches[:, 1]], scores_second[matches[:, 1]])
+        t.states[r_tracked[np.asarray(u_track, dtype=int)]] = TrackState.Lost
 
         '''Deal with unconfirmed tracks, usually tracks with only one beginning frame'''
-        detections = [detections[i] for i in u_detection]
-        dists = iou_distance(unconfirmed, detections)
-        if not self.args.mot20:
-            dists = fuse_score(dists, detections)
+        u_detection = np.asarray(u_detection, dtype=int)
+        dets, scores_keep = dets[u_detection], scores_keep[u_detection]
+        if class_aware:
+            cls_keep = cls_keep[u_detection]
+        dists = self._iou_cost(unconfirmed, dets, scores_keep, cls_keep)
         matches, u_unconfirmed, u_detection = linear_assignment(dists, thresh=0.7)
-        for itracked, idet in matches:
-            unconfirmed[itracked].update(detections[idet], self.frame_id)
-            activated_starcks.append(unconfirmed[itracked])
-        for it in u_unconfirmed:
-            track = unconfirmed[it]
-            track.mark_removed()
-            removed_stracks.append(track)
+        if len(matches):
+            self._update_rows(unconfirmed[matches[:, 0]], dets[matches[:, 1]], scores_keep[matches[:, 1]])
+        t.states[unconfirmed[np.asarray(u_unconfirmed, dtype=int)]] = TrackState.Removed
 
         """ Step 4: Init new stracks"""
-        for inew in u_detection:
-            track = detections[inew]
-            if track.score < self.det_thresh:
-                continue
-            track.activate(self.kalman_filter, self.frame_id)
-            activated_starcks.append(track)
+        u_detection = np.asarray(u_detection, dtype=int)
+        new = u_detection[scores_keep[u_detection] >= self.det_thresh]
+        if len(new):
+            tlwh = dets[new].copy()
+            tlwh[:, 2:] -= tlwh[:, :2]
+            states = [self.kalman_filter.initiate(STrack.tlwh_to_xyah(box)) for box in tlwh]
+            t.add([STrack.next_id() for _ in new],
+                  np.asarray([m for m, _ in states]), np.asarray([c for _, c in states]),
+                  scores_keep[new], self.frame_id, activated=self.frame_id == 1,
+                  classes=cls_keep[new] if class_aware else -1)
+
         """ Step 5: Update state"""
-        for track in self.lost_stracks:
-            if self.frame_id - track.end_frame > self.max_time_lost:
-                track.mark_removed()
-                removed_stracks.append(track)
-
-        self.tracked_stracks = [t for t in self.tracked_stracks if t.state == TrackState.Tracked]
-        self.tracked_stracks = joint_stracks(self.tracked_stracks, activated_starcks)
-        self.tracked_stracks = joint_stracks(self.tracked_stracks, refind_stracks)
-        self.lost_stracks = sub_stracks(self.lost_stracks, self.tracked_stracks)
-        self.lost_stracks.extend(lost_stracks)
-        self.lost_stracks = sub_stracks(self.lost_stracks, self.removed_stracks)
-        self.removed_stracks.extend(removed_stracks)
-        self.tracked_stracks, self.lost_stracks = remove_duplicate_stracks(self.tracked_stracks, self.lost_stracks)
-        # get scores of lost tracks
-        output_stracks = [track for track in self.tracked_stracks if track.is_activated]
-        # print("orinal",output_stracks)
-
-        return output_stracks
+        lost = t.where(TrackState.Lost)
+        t.states[lost[self.frame_id - t.frame_ids[lost] > self.max_time_lost]] = TrackState.Removed
+        self._remove_duplicates()
+        t.compact()
+
+    def _remove_duplicates(self):
+        """Of a tracked and a lost track overlapping almost fully, drop the younger"""
+        t = self.tracks
+        tracked, lost = t.where(TrackState.Tracked), t.where(TrackState.Lost)
+        if len(tracked) == 0 or len(lost) == 0:
+            return
+        p, q = np.nonzero(1 - ious(t.tlbr(tracked), t.tlbr(lost)) < 0.15)
+        timep = t.frame_ids[tracked[p]] - t.start_frames[tracked[p]]
+        timeq = t.frame_ids[lost[q]] - t.start_frames[lost[q]]
+        t.states[lost[q[timep > timeq]]] = TrackState.Removed
+        t.states[tracked[p[timep <= timeq]]] = TrackState.Removed
+
+    def _outputs(self):
+        return [STrack.from_table(self.tracks, i) for i in self.tracks.where(TrackState.Tracked, activated=True)]
+
+    def update(self, output_results, img_info, img_size, filter_class):
+        self.frame_id += 1
+        output_results = to_numpy(output_results)
+
+        if output_results.shape[1] == 5:
+            scores = output_results[:, 4]
+            bboxes = output_results[:, :4]
+            cls = None
+        else:
+            scores = output_results[:, 4] *output_results[:,5]
+            bboxes = output_results[:, :4]  # x1y1x2y2
+            cls = output_results[:, 5]
+
+        self._step(bboxes, scores, cls, filter_class)
+        return self._outputs()
+
     def fillter_output(self,outputs):
-        outputs=outputs.cpu().detach().numpy()
-        outputs=outputs.tolist()
-        # print("outputs list: ", outputs)
-        # dict_class={"0":[],"1":[],"2":[],"3":[],"4":[]}
-        dict_class={}
-        for output in outputs:
-            cls=output[-1]
-            dict_class.update({str(int(cls)):[]})
-        for output in outputs:
-            cls=int(output[-1])
-            if str(int(cls)) in dict_class.keys():
-                dict_class[str(cls)].append(output)
+        outputs = to_numpy(outputs)
+        dict_class = {}
+        for cls in np.unique(outputs[:, -1].astype(int)):
+            dict_class[str(cls)] = outputs[outputs[:, -1].astype(int) == cls]
         return dict_class
-            
-                
-                
-        
-
-            
-            
-            
+
     def update_multi_label(self,output_results, img_info, img_size, filter_class) :
-        # SELECT GROUPS SAME CLASS
-        fillter_class=self.fillter_output(output_results)
-        # print(fillter_class)
-        # values=fillter_class.values()
-        # print(values)
-        output_stracks=[]
-        if len(fillter_class)>0:
-            for value in fillter_class.values():
-                self.frame_id += 1
-                activated_starcks = []
-                refind_stracks = []
-                lost_stracks = []
-                removed_stracks = []
-                it=torch.tensor(np.asarray(value))
-                # print(it)
-                scores = output_results[:, 4] *output_results[:,5]
-                bboxes = output_results[:, :4]  # x1y1x2y2
-                cls = output_results[:, 5]
-                img_h, img_w = img_info[0], img_info[1]
-                scale = min(img_size[0] / float(img_h), img_size[1] / float(img_w))
-                bboxes /= 1
-                remain_inds = scores > self.args.track_thresh
-                inds_low = scores > 0.1
-                inds_high = scores < self.args.track_thresh
-
-                inds_second = np.logical_and(inds_low, inds_high)
-                dets_second = bboxes[inds_second]
-                dets = bboxes[remain_inds]
-                # print(dets)
-
-                scores_keep = scores[remain_inds]
-                scores_second = scores[inds_second]
-                remain_inds = scores > self.args.track_thresh
-                inds_low = scores > 0.1
-                inds_high = scores < self.args.track_thresh
-
-                inds_second = np.logical_and(inds_low, inds_high)
-                dets_second = bboxes[inds_second]
-                dets = bboxes[remain_inds]
-                # print(dets)
-
-                scores_keep = scores[remain_inds]
-                scores_second = scores[inds_second]
-
-                if len(dets) > 0:
-                    '''Detections'''
-                    detections = [STrack(STrack.tlbr_to_tlwh(tlbr), s) for
-                                (tlbr, s,id_cls) in zip(dets, scores_keep,cls) if id_cls in filter_class]
-                else:
-                    detections = []
-
-                ''' Add newly detected tracklets to tracked_stracks'''
-                unconfirmed = []
-                tracked_stracks = []  # type: list[STrack]
-                for track in self.tracked_stracks:
-                    if not track.is_activated:
-                        unconfirmed.append(track)
-                    else:
-                        tracked_stracks.append(track)
-
-                ''' Step 2: First association, with high score detection boxes'''
-                strack_pool = joint_stracks(tracked_stracks, self.lost_stracks)
-                # Predict the current location with KF
-                STrack.multi_predict(strack_pool, self.kalman_filter)
-                dists = iou_distance(strack_pool, detections)
-                if not self.args.mot20:
-                    dists = fuse_score(dists, detections)
-                matches, u_track, u_detection = linear_assignment(dists, thresh=self.args.match_thresh)
-
-                for itracked, idet in matches:
-                    track = strack_pool[itracked]
-                    det = detections[idet]
-                    if track.state == TrackState.Tracked:
-                        track.update(detections[idet], self.frame_id)
-                        activated_starcks.append(track)
-                    else:
-                        track.re_activate(det, self.frame_id, new_id=False)
-                        refind_stracks.append(track)
-
-                ''' Step 3: Second association, with low scor e detection boxes'''
-                # association the untrack to the low score detections
-                if len(dets_second) > 0:
-                    '''Detections'''
-                    detections_second = [STrack(STrack.tlbr_to_tlwh(tlbr), s) for
-                                (tlbr, s) in zip(dets_second, scores_second)]
-                else:
-                    detections_second = []
-                r_tracked_stracks = [strack_pool[i] for i in u_track if strack_pool[i].state == TrackState.Tracked]
-                dists = iou_distance(r_tracked_stracks, detections_second)
-                matches, u_track, u_detection_second =linear_assignment(dists, thresh=0.5)
-                for itracked, idet in matches:
-                    track = r_tracked_stracks[itracked]
-                    det = detections_second[idet]
-                    if track.state == TrackState.Tracked:
-                        track.update(det, self.frame_id)
-                        activated_starcks.append(track)
-                    else:
-                        track.re_activate(det, self.frame_id, new_id=False)
-                        refind_stracks.append(track)
-
-                for it in u_track:
-                    track = r_tracked_stracks[it]
-                    if not track.state == TrackState.Lost:
-                        track.mark_lost()
-                        lost_stracks.append(track)
-
-                '''Deal with unconfirmed tracks, usually tracks with only one beginning frame'''
-                detections = [detections[i] for i in u_detection]
-                dists = iou_distance(unconfirmed, detections)
-                if not self.args.mot20:
-                    dists = fuse_score(dists, detections)
-                matches, u_unconfirmed, u_detection = linear_assignment(dists, thresh=0.7)
-                for itracked, idet in matches:
-                    unconfirmed[itracked].update(detections[idet], self.frame_id)
-                    activated_starcks.append(unconfirmed[itracked])
-                for it in u_unconfirmed:
-                    track = unconfirmed[it]
-                    track.mark_removed()
-                    removed_stracks.append(track)
-
-                """ Step 4: Init new stracks"""
-                for inew in u_detection:
-                    track = detections[inew]
-                    if track.score < self.det_thresh:
-                        continue
-                    track.activate(self.kalman_filter, self.frame_id)
-                    activated_starcks.append(track)
-                """ Step 5: Update state"""
-                for track in self.lost_stracks:
-                    if self.frame_id - track.end_frame > self.max_time_lost:
-                        track.mark_removed()
-                        removed_stracks.append(track)
-
-                self.tracked_stracks = [t for t in self.tracked_stracks if t.state == TrackState.Tracked]
-                self.tracked_stracks = joint_stracks(self.tracked_stracks, activated_starcks)
-                self.tracked_stracks = joint_stracks(self.tracked_stracks, refind_stracks)
-                self.lost_stracks = sub_stracks(self.lost_stracks, self.tracked_stracks)
-                self.lost_stracks.extend(lost_stracks)
-                self.lost_stracks = sub_stracks(self.lost_stracks, self.removed_stracks)
-                self.removed_stracks.extend(removed_stracks)
-                self.tracked_stracks, self.lost_stracks = remove_duplicate_stracks(self.tracked_stracks, self.lost_stracks)
-                # get scores of lost tracks
-                output_stracks.append([track for track in self.tracked_stracks if track.is_activated])
-        return output_stracks
-                
-        
-        
-        
-        
-def joint_stracks(tlista, tlistb):
-    exists = {}
-    res = []
-    for t in tlista:
-        exists[t.track_id] = 1
-        res.append(t)
-    for t in tlistb:
-        tid = t.track_id
-        if not exists.get(tid, 0):
-            exists[tid] = 1
-            res.append(t)
-    return res
-
-
-def sub_stracks(tlista, tlistb):
-    stracks = {}
-    for t in tlista:
-        stracks[t.track_id] = t
-    for t in tlistb:
-        tid = t.track_id
-        if stracks.get(tid, 0):
-            del stracks[tid]
-    return list(stracks.values())
-
-
-def remove_duplicate_stracks(stracksa, stracksb):
-    pdist = iou_distance(stracksa, stracksb)
-    pairs = np.where(pdist < 0.15)
-    dupa, dupb = list(), list()
-    for p, q in zip(*pairs):
-        timep = stracksa[p].frame_id - stracksa[p].start_frame
-        timeq = stracksb[q].frame_id - stracksb[q].start_frame
-        if timep > timeq:
-            dupb.append(q)
-        else:
-            dupa.append(p)
-    resa = [t for i, t in enumerate(stracksa) if not i in dupa]
-    resb = [t for i, t in enumerate(stracksb) if not i in dupb]
-    return resa, resb
\ No newline at end of file
+        """Track all classes in a single association pass.
+
+        The class is the last column of `output_results`; a track only
+        matches detections of its own class. Returns the active tracks
+        grouped per class present in this frame, in ascending class order.
+        """
+        self.frame_id += 1
+        output_results = to_numpy(output_results)
+
+        scores = output_results[:, 4] *output_results[:,5]
+        bboxes = output_results[:, :4]  # x1y1x2y2
+        cls = output_results[:, -1]
+
+        self._step(bboxes, scores, cls, filter_class, class_aware=True)
+        output_stracks = self._outputs()
+        return [[track for track in output_stracks if track.cls == c]
+                for c in np.unique(cls.astype(np.int64))]
+
+
+def to_numpy(output_results):
+    """Detections as a float ndarray, accepting torch tensors"""
+    if hasattr(output_results, 'cpu'):
+        output_results = output_results.cpu().detach().numpy()
+    return np.asarray(output_results, dtype=np.float64)
@@ -0,0 +1,113 @@
+"""
+IoU backends for the tracker.
+
+All backends follow the cython_bbox convention (boxes are inclusive pixel
+ranges, hence the +1 on widths and heights) and return an NxK float64
+matrix. The fastest available backend is picked at import:
+
+    numba        JIT compiled loops, if numba is installed
+    cython_bbox  the original compiled extension, if installed
+    numpy        vectorized broadcasting, always available
+
+Set LANCS_IOU_BACKEND to one of the names above to force a backend.
+"""
+import os
+
+import numpy as np
+
+
+def bbox_ious_numpy(boxes, query_boxes):
+    """Vectorized IoU between (N, 4) `boxes` and (K, 4) `query_boxes`"""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    query_boxes = np.asarray(query_boxes, dtype=np.float64)
+    if len(boxes) == 0 or len(query_boxes) == 0:
+        return np.zeros((len(boxes), len(query_boxes)), dtype=np.float64)
+
+    iw = (np.minimum(boxes[:, None, 2], query_boxes[None, :, 2]) -
+          np.maximum(boxes[:, None, 0], query_boxes[None, :, 0]) + 1)
+    ih = (np.minimum(boxes[:, None, 3], query_boxes[None, :, 3]) -
+          np.maximum(boxes[:, None, 1], query_boxes[None, :, 1]) + 1)
+    np.maximum(iw, 0, out=iw)
+    np.maximum(ih, 0, out=ih)
+    inter = iw * ih
+
+    box_area = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+    query_area = (query_boxes[:, 2] - query_boxes[:, 0] + 1) * (query_boxes[:, 3] - query_boxes[:, 1] + 1)
+    union = box_area[:, None] + query_area[None, :] - inter
+
+    overlaps = np.zeros_like(inter)
+    np.divide(inter, union, out=overlaps, where=inter > 0)
+    return overlaps
+
+
+def _load_numba():
+    from numba import njit
+
+    @njit(cache=True, nogil=True)
+    def _overlaps(boxes, query_boxes):
+        n_boxes, n_query = boxes.shape[0], query_boxes.shape[0]
+        overlaps = np.zeros((n_boxes, n_query), dtype=np.float64)
+        for k in range(n_query):
+            box_area = ((query_boxes[k, 2] - query_boxes[k, 0] + 1) *
+                        (query_boxes[k, 3] - query_boxes[k, 1] + 1))
+            for n in range(n_boxes):
+                iw = (min(boxes[n, 2], query_boxes[k, 2]) -
+                      max(boxes[n, 0], query_boxes[k, 0]) + 1)
+                if iw > 0:
+                    ih = (min(boxes[n, 3], query_boxes[k, 3]) -
+                          max(boxes[n, 1], query_boxes[k, 1]) + 1)
+                    if ih > 0:
+                        ua = ((boxes[n, 2] - boxes[n, 0] + 1) *
+                              (boxes[n, 3] - boxes[n, 1] + 1) +
+                              box_area - iw * ih)
+                        overlaps[n, k] = iw * ih / ua
+        return overlaps
+
+    def bbox_ious_numba(boxes, query_boxes):
+        return _overlaps(np.ascontiguousarray(boxes, dtype=np.float64).reshape(-1, 4),
+                         np.ascontiguousarray(query_boxes, dtype=np.float64).reshape(-1, 4))
+
+    return bbox_ious_numba
+
+
+def _load_cython_bbox():
+    from cython_bbox import bbox_overlaps
+
+    def bbox_ious_cython(boxes, query_boxes):
+        return bbox_overlaps(np.ascontiguousarray(boxes, dtype=np.float64).reshape(-1, 4),
+                             np.ascontiguousarray(query_boxes, dtype=np.float64).reshape(-1, 4))
+
+    return bbox_ious_cython
+
+
+_LOADERS = {
+    'numba': _load_numba,
+    'cython_bbox': _load_cython_bbox,
+    'numpy': lambda: bbox_ious_numpy,
+}
+
+
+def available_backends():
+    """Name -> IoU function of every backend that can be loaded here"""
+    backends = {}
+    for name, loader in _LOADERS.items():
+        try:
+            backends[name] = loader()
+        except ImportError:
+            continue
+    return backends
+
+
+def select_backend(name=None):
+    """Return (name, function) of the requested or the first available backend"""
+    names = [name] if name else list(_LOADERS)
+    for candidate in names:
+        try:
+            return candidate, _LOADERS[candidate]()
+        except ImportError:
+            if name:
+                raise
+    return 'numpy', bbox_ious_numpy
+
+
+BACKEND, bbox_ious = select_backend(os.environ.get('LANCS_IOU_BACKEND') or None)
@@ -189,6 +189,61 @@ class KalmanFilter(object):
 
         return mean, covariance
 
+    def multi_project(self, mean, covariance):
+        """Project N state distributions to measurement space (Vectorized version).
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional mean matrix of the states.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices of the states.
+        Returns
+        -------
+        (ndarray, ndarray)
+            Returns the Nx4 projected means and Nx4x4 projected covariance
+            matrices.
+        """
+        height = mean[:, 3]
+        std = np.empty((len(mean), 4))
+        std[:, [0, 1, 3]] = self._std_weight_position * height[:, None]
+        std[:, 2] = 1e-1
+        diag = np.arange(4)
+
+        # The update matrix selects the first 4 state dimensions
+        projected_mean = mean[:, :4].copy()
+        projected_cov = covariance[:, :4, :4].copy()
+        projected_cov[:, diag, diag] += np.square(std)
+        return projected_mean, projected_cov
+
+    def multi_update(self, mean, covariance, measurement):
+        """Run Kalman filter correction step for N states (Vectorized version).
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional predicted mean matrix.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices.
+        measurement : ndarray
+            The Nx4 dimensional matrix of measurements (x, y, a, h).
+        Returns
+        -------
+        (ndarray, ndarray)
+            Returns the measurement-corrected Nx8 means and Nx8x8 covariance
+            matrices.
+        """
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+
+        # K = P H^T S^-1, solved as S K^T = H P^T with S symmetric
+        kalman_gain = np.linalg.solve(
+            projected_cov, covariance[:, :, :4].transpose(0, 2, 1)
+        ).transpose(0, 2, 1)
+        innovation = measurement - projected_mean
+
+        new_mean = mean + np.einsum("nij,nj->ni", kalman_gain, innovation)
+        new_covariance = covariance - np.matmul(np.matmul(
+            kalman_gain, projected_cov), kalman_gain.transpose(0, 2, 1))
+        return new_mean, new_covariance
+
     def update(self, mean, covariance, measurement):
         """Run Kalman filter correction step.
 
@@ -264,4 +319,42 @@ class KalmanFilter(object):
                 overwrite_b=True)
             return np.sum(z * z, axis=0)
         else:
-            raise ValueError('invalid distance metric')
\ No newline at end of file
+            raise ValueError('invalid distance metric')
+
+    def multi_gating_distance(self, mean, covariance, measurements,
+                              only_position=False, metric='maha'):
+        """Compute gating distances between N state distributions and M
+        measurements at once (Vectorized version of `gating_distance`).
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional mean matrix of the states.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices of the states.
+        measurements : ndarray
+            An Mx4 dimensional matrix of M measurements (x, y, a, h).
+        only_position : Optional[bool]
+            If True, distance computation is done with respect to the bounding
+            box center position only.
+        Returns
+        -------
+        ndarray
+            Returns an NxM matrix where element (i, j) is the squared
+            distance between state i and `measurements[j]`.
+        """
+        mean, covariance = self.multi_project(mean, covariance)
+        if only_position:
+            mean, covariance = mean[:, :2], covariance[:, :2, :2]
+            measurements = measurements[:, :2]
+
+        d = measurements[None, :, :] - mean[:, None, :]
+        if metric == 'gaussian':
+            return np.sum(d * d, axis=2)
+        elif metric == 'maha':
+            # Batched Cholesky factors, inverted once per track (4x4) so the
+            # NxM solve becomes a single batched matrix product
+            cholesky_inv = np.linalg.inv(np.linalg.cholesky(covariance))
+            z = np.matmul(d, cholesky_inv.transpose(0, 2, 1))
+            return np.einsum('nmk,nmk->nm', z, z)
+        else:
+            raise ValueError('invalid distance metric')
@@ -0,0 +1,111 @@
+import numpy as np
+from collections import deque
+
+from core.basetrack import TrackState
+
+
+class TrackTable(object):
+    """
+    Structure-of-arrays store of the tracks of a BYTETracker.
+
+    Row i of every column describes one track. State transitions are done
+    on index arrays, so no per-track objects or id dictionaries are built
+    per frame. Removed tracks are compacted out of the table and only the
+    last `max_removed` of them are remembered.
+    """
+
+    # column name -> (shape of one row, dtype)
+    COLUMNS = {
+        'ids': ((), np.int64),
+        'states': ((), np.int8),
+        'activated': ((), bool),
+        'means': ((8,), np.float64),
+        'covariances': ((8, 8), np.float64),
+        'scores': ((), np.float64),
+        'frame_ids': ((), np.int64),
+        'start_frames': ((), np.int64),
+        'tracklet_len': ((), np.int64),
+        'classes': ((), np.int64),
+    }
+
+    def __init__(self, capacity=64, max_removed=1000):
+        self.size = 0
+        self._alloc(capacity)
+        # (track_id, start_frame, end_frame) of the most recently removed tracks
+        self.removed = deque(maxlen=max_removed)
+
+    def _alloc(self, capacity):
+        """(Re)allocate every column with room for `capacity` rows"""
+        for name, (shape, dtype) in self.COLUMNS.items():
+            column = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.size:
+                column[:self.size] = getattr(self, '_' + name)[:self.size]
+            setattr(self, '_' + name, column)
+
+    def __len__(self):
+        return self.size
+
+    # Views of the live rows
+    ids = property(lambda self: self._ids[:self.size])
+    states = property(lambda self: self._states[:self.size])
+    activated = property(lambda self: self._activated[:self.size])
+    means = property(lambda self: self._means[:self.size])
+    covariances = property(lambda self: self._covariances[:self.size])
+    scores = property(lambda self: self._scores[:self.size])
+    frame_ids = property(lambda self: self._frame_ids[:self.size])
+    start_frames = property(lambda self: self._start_frames[:self.size])
+    tracklet_len = property(lambda self: self._tracklet_len[:self.size])
+    classes = property(lambda self: self._classes[:self.size])
+
+    def add(self, ids, means, covariances, scores, frame_id, activated, classes=-1):
+        """Append new tracks in the Tracked state, returns their row indices.
+        `classes` is -1 for tracks of a class-agnostic tracker."""
+        n = len(ids)
+        if self.size + n > len(self._ids):
+            self._alloc(max(2 * len(self._ids), self.size + n))
+        rows = np.arange(self.size, self.size + n)
+        self.size += n
+        self.ids[rows] = ids
+        self.states[rows] = TrackState.Tracked
+        self.activated[rows] = activated
+        self.means[rows] = means
+        self.covariances[rows] = covariances
+        self.scores[rows] = scores
+        self.frame_ids[rows] = frame_id
+        self.start_frames[rows] = frame_id
+        self.tracklet_len[rows] = 0
+        self.classes[rows] = classes
+        return rows
+
+    def where(self, state, activated=None):
+        """Row indices in `state`, optionally filtered on the activated flag"""
+        mask = self.states == state
+        if activated is not None:
+            mask &= self.activated == activated
+        return np.flatnonzero(mask)
+
+    def tlbr(self, rows):
+        """Boxes `(min x, min y, max x, max y)` of the given rows"""
+        xyah = self.means[rows, :4]
+        w = xyah[:, 2] * xyah[:, 3]
+        ret = np.empty((len(xyah), 4))
+        ret[:, 0] = xyah[:, 0] - w / 2
+        ret[:, 1] = xyah[:, 1] - xyah[:, 3] / 2
+        ret[:, 2] = ret[:, 0] + w
+        ret[:, 3] = ret[:, 1] + xyah[:, 3]
+        return ret
+
+    def compact(self):
+        """Drop the Removed rows, remembering them in `removed`"""
+        keep = self.states != TrackState.Removed
+        if keep.all():
+            return
+        gone = np.flatnonzero(~keep)
+        self.removed.extend(zip(self.ids[gone].tolist(),
+                                self.start_frames[gone].tolist(),
+                                self.frame_ids[gone].tolist()))
+        n = int(keep.sum())
+        for name in self.COLUMNS:
+            column = getattr(self, '_' + name)
+            column[:n] = column[:self.size][keep]
+        self.size = n
@@ -14,6 +14,11 @@ class Detection():
         Classified name of face in detection bbox
     feature : array_like
         A feature vector that describes the object contained in this image.
+    expression : Optional[Any]
+        Facial expression classified for the face in this detection.
+    cached : bool
+        True if `feature` and `expression` were reused from the track this
+        detection is expected to belong to instead of computed for this image.
 
     Attributes
     ----------
@@ -23,13 +28,19 @@ class Detection():
         Classified name of face in detection bbox
     feature : ndarray | NoneType
         A feature vector that describes the object contained in this image.
+    expression : Optional[Any]
+        Facial expression classified for the face in this detection.
+    cached : bool
+        True if `feature` and `expression` were reused from a track.
 
     """
 
-    def __init__(self, tlwh, name, feature):
-        self.tlwh = np.asarray(tlwh, dtype=np.float)
+    def __init__(self, tlwh, name, feature, expression=None, cached=False):
+        self.tlwh = np.asarray(tlwh, dtype=np.float64)
         self.name = name
         self.feature = np.asarray(feature, dtype=np.float32)
+        self.expression = expression
+        self.cached = cached
 
     def get_name(self):
         return self.name
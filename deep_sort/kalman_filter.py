@@ -122,6 +122,40 @@ class KalmanFilter(object):
 
         return mean, covariance
 
+    def multi_predict(self, mean, covariance):
+        """Run Kalman filter prediction step for N tracks at once.
+
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional mean matrix of the object states at the previous
+            time step.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices of the object states at the
+            previous time step.
+
+        Returns
+        -------
+        (ndarray, ndarray)
+            Returns the Nx8 mean matrix and Nx8x8 covariance matrices of the
+            predicted states.
+
+        """
+        height = mean[:, 3]
+        std = np.empty((len(mean), 8))
+        std[:, [0, 1, 3]] = self._std_weight_position * height[:, None]
+        std[:, 2] = 1e-2
+        std[:, [4, 5, 7]] = self._std_weight_velocity * height[:, None]
+        std[:, 6] = 1e-5
+        motion_cov = np.zeros((len(mean), 8, 8))
+        diag = np.arange(8)
+        motion_cov[:, diag, diag] = np.square(std)
+
+        mean = np.dot(mean, self._motion_mat.T)
+        covariance = np.matmul(np.matmul(
+            self._motion_mat, covariance), self._motion_mat.T) + motion_cov
+        return mean, covariance
+
     def project(self, mean, covariance):
         """Project state distribution to measurement space.
 
@@ -151,6 +185,35 @@ class KalmanFilter(object):
             self._update_mat, covariance, self._update_mat.T))
         return mean, covariance + innovation_cov
 
+    def multi_project(self, mean, covariance):
+        """Project N state distributions to measurement space.
+
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional mean matrix of the states.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices of the states.
+
+        Returns
+        -------
+        (ndarray, ndarray)
+            Returns the Nx4 projected means and Nx4x4 projected covariance
+            matrices.
+
+        """
+        height = mean[:, 3]
+        std = np.empty((len(mean), 4))
+        std[:, [0, 1, 3]] = self._std_weight_position * height[:, None]
+        std[:, 2] = 1e-1
+        diag = np.arange(4)
+
+        # The update matrix selects the first 4 state dimensions
+        projected_mean = mean[:, :4].copy()
+        projected_cov = covariance[:, :4, :4].copy()
+        projected_cov[:, diag, diag] += np.square(std)
+        return projected_mean, projected_cov
+
     def update(self, mean, covariance, measurement):
         """Run Kalman filter correction step.
 
@@ -185,6 +248,39 @@ class KalmanFilter(object):
             kalman_gain, projected_cov, kalman_gain.T))
         return new_mean, new_covariance
 
+    def multi_update(self, mean, covariance, measurement):
+        """Run Kalman filter correction step for N tracks at once.
+
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional predicted mean matrix.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices.
+        measurement : ndarray
+            The Nx4 dimensional matrix of measurements (x, y, a, h), one per
+            track.
+
+        Returns
+        -------
+        (ndarray, ndarray)
+            Returns the measurement-corrected Nx8 means and Nx8x8 covariance
+            matrices.
+
+        """
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+
+        # K = P H^T S^-1, solved as S K^T = H P^T with S symmetric
+        kalman_gain = np.linalg.solve(
+            projected_cov, covariance[:, :, :4].transpose(0, 2, 1)
+        ).transpose(0, 2, 1)
+        innovation = measurement - projected_mean
+
+        new_mean = mean + np.einsum("nij,nj->ni", kalman_gain, innovation)
+        new_covariance = covariance - np.matmul(np.matmul(
+            kalman_gain, projected_cov), kalman_gain.transpose(0, 2, 1))
+        return new_mean, new_covariance
+
     def gating_distance(self, mean, covariance, measurements,
                         only_position=False):
         """Compute gating distance between state distribution and measurements.
@@ -227,3 +323,39 @@ class KalmanFilter(object):
             overwrite_b=True)
         squared_maha = np.sum(z * z, axis=0)
         return squared_maha
+
+    def multi_gating_distance(self, mean, covariance, measurements,
+                              only_position=False):
+        """Compute gating distances between N state distributions and M
+        measurements at once (vectorized version of `gating_distance`).
+
+        Parameters
+        ----------
+        mean : ndarray
+            The Nx8 dimensional mean matrix of the states.
+        covariance : ndarray
+            The Nx8x8 dimensional covariance matrices of the states.
+        measurements : ndarray
+            An Mx4 dimensional matrix of M measurements (x, y, a, h).
+        only_position : Optional[bool]
+            If True, distance computation is done with respect to the bounding
+            box center position only.
+
+        Returns
+        -------
+        ndarray
+            Returns an NxM matrix where element (i, j) is the squared
+            Mahalanobis distance between state i and `measurements[j]`.
+
+        """
+        mean, covariance = self.multi_project(mean, covariance)
+        if only_position:
+            mean, covariance = mean[:, :2], covariance[:, :2, :2]
+            measurements = measurements[:, :2]
+
+        # Inverse Cholesky factors are small (4x4), inverting them turns the
+        # N triangular solves into one batched matrix product
+        cholesky_inv = np.linalg.inv(np.linalg.cholesky(covariance))
+        d = measurements[None, :, :] - mean[:, None, :]
+        z = np.matmul(d, cholesky_inv.transpose(0, 2, 1))
+        return np.einsum('nmk,nmk->nm', z, z)
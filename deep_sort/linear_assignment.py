@@ -54,18 +54,30 @@ def min_cost_matching(
 
     cost_matrix = distance_metric(
         tracks, detections, track_indices, detection_indices)
+    return _solve_cost_matrix(
+        cost_matrix, max_distance, track_indices, detection_indices)
+
+
+def _solve_cost_matrix(cost_matrix, max_distance, track_indices,
+                       detection_indices):
+    """Solve the assignment of an already computed cost matrix, see
+    `min_cost_matching`. `cost_matrix` is modified in place."""
     cost_matrix[cost_matrix > max_distance] = max_distance + 1e-5
     # print("cost_matrix", cost_matrix)
     indices = linear_sum_assignment(cost_matrix)
     indices = np.asarray(indices)
     indices = np.transpose(indices)
-    matches, unmatched_tracks, unmatched_detections = [], [], []
-    for col, detection_idx in enumerate(detection_indices):
-        if col not in indices[:, 1]:
-            unmatched_detections.append(detection_idx)
-    for row, track_idx in enumerate(track_indices):
-        if row not in indices[:, 0]:
-            unmatched_tracks.append(track_idx)
+    matched_rows = np.zeros(len(track_indices), dtype=bool)
+    matched_cols = np.zeros(len(detection_indices), dtype=bool)
+    matched_rows[indices[:, 0]] = True
+    matched_cols[indices[:, 1]] = True
+    matches = []
+    unmatched_tracks = [
+        track_idx for row, track_idx in enumerate(track_indices)
+        if not matched_rows[row]]
+    unmatched_detections = [
+        detection_idx for col, detection_idx in enumerate(detection_indices)
+        if not matched_cols[col]]
     for row, col in indices:
         track_idx = track_indices[row]
         detection_idx = detection_indices[col]
@@ -83,6 +95,13 @@ def matching_cascade(
         track_indices=None, detection_indices=None):
     """Run matching cascade.
 
+    The first non-empty level is matched against all detections. The cost
+    matrix of the deeper levels against the detections left after it is
+    computed once, and each deeper level is solved on the slice of its
+    tracks and the detections still unmatched. `distance_metric` must
+    therefore compute every entry independently of the other rows and
+    columns, which holds for appearance distances with Kalman gating.
+
     Parameters
     ----------
     distance_metric : Callable[List[Track], List[Detection], List[int], List[int]) -> ndarray
@@ -124,22 +143,40 @@ def matching_cascade(
 
     unmatched_detections = detection_indices
     matches = []
-    for level in range(cascade_depth):
-        if len(unmatched_detections) == 0:  # No detections left
-            break
-
-        track_indices_l = [
-            k for k in track_indices
-            if tracks[k].time_since_update == 1 + level
-        ]
-        if len(track_indices_l) == 0:  # Nothing to match at this level
-            continue
-
-        matches_l, _, unmatched_detections = \
-            min_cost_matching(
-                distance_metric, max_distance, tracks, detections,
-                track_indices_l, unmatched_detections)
-        matches += matches_l
+    # Tracks of each level, empty levels are never visited
+    levels = {}
+    for k in track_indices:
+        level = tracks[k].time_since_update
+        if 1 <= level <= cascade_depth:
+            levels.setdefault(level, []).append(k)
+    levels = [levels[level] for level in sorted(levels)]
+    if len(levels) == 0 or len(detection_indices) == 0:
+        unmatched_tracks = list(set(track_indices))
+        return matches, unmatched_tracks, unmatched_detections
+
+    # The first level takes most detections, the deeper levels share one
+    # cost matrix against the detections it left unmatched
+    matches, _, unmatched_detections = min_cost_matching(
+        distance_metric, max_distance, tracks, detections, levels[0],
+        unmatched_detections)
+    deeper_tracks = [k for level in levels[1:] for k in level]
+    if len(deeper_tracks) and len(unmatched_detections):
+        cost_matrix = distance_metric(
+            tracks, detections, deeper_tracks, unmatched_detections)
+        row_of = {k: row for row, k in enumerate(deeper_tracks)}
+        col_of = {k: col for col, k in enumerate(unmatched_detections)}
+
+        for track_indices_l in levels[1:]:
+            if len(unmatched_detections) == 0:  # No detections left
+                break
+
+            cost_matrix_l = cost_matrix[np.ix_(
+                [row_of[k] for k in track_indices_l],
+                [col_of[k] for k in unmatched_detections])]
+            matches_l, _, unmatched_detections = _solve_cost_matrix(
+                cost_matrix_l, max_distance, track_indices_l,
+                unmatched_detections)
+            matches += matches_l
     unmatched_tracks = list(set(track_indices) - set(k for k, _ in matches))
     return matches, unmatched_tracks, unmatched_detections
 
@@ -183,12 +220,13 @@ def gate_cost_matrix(
     """
     gating_dim = 2 if only_position else 4
     gating_threshold = kalman_filter.chi2inv95[gating_dim]
+    if len(track_indices) == 0 or len(detection_indices) == 0:
+        return cost_matrix
     measurements = np.asarray(
         [detections[i].to_xyah() for i in detection_indices])
-    for row, track_idx in enumerate(track_indices):
-        track = tracks[track_idx]
-        gating_distance = kf.gating_distance(
-            track.mean, track.covariance, measurements, only_position)
-        # print("gating_distance:", gating_distance)
-        cost_matrix[row, gating_distance > gating_threshold] = gated_cost
+    gating_distance = kf.multi_gating_distance(
+        np.asarray([tracks[i].mean for i in track_indices]),
+        np.asarray([tracks[i].covariance for i in track_indices]),
+        measurements, only_position)
+    cost_matrix[gating_distance > gating_threshold] = gated_cost
     return cost_matrix
@@ -101,6 +101,10 @@ class NearestNeighborDistanceMetric(object):
     A nearest neighbor distance metric that, for each target, returns
     the closest distance to any sample that has been observed so far.
 
+    The samples of all targets live in one preallocated array, one ring
+    buffer of `budget` rows per target, so memory stays constant and
+    `distance` is a single matrix product followed by a min per target.
+
     Parameters
     ----------
     metric : str
@@ -110,13 +114,14 @@ class NearestNeighborDistanceMetric(object):
         invalid match.
     budget : Optional[int]
         If not None, fix samples per class to at most this number. Removes
-        the oldest samples when the budget is reached.
+        the oldest samples when the budget is reached. If None the buffers
+        grow as needed.
 
     Attributes
     ----------
-    samples : Dict[int -> List[ndarray]]
-        A dictionary that maps from target identities to the list of samples
-        that have been observed so far.
+    samples : Dict[int -> ndarray]
+        A dictionary that maps from target identities to the samples that
+        are currently kept for them (normalized for the cosine metric).
 
     """
 
@@ -124,15 +129,56 @@ class NearestNeighborDistanceMetric(object):
 
 
         if metric == "euclidean":
-            self._metric = _nn_euclidean_distance
+            self._pairwise = _pdist
+            self._normalize = False
         elif metric == "cosine":
-            self._metric = _nn_cosine_distance
+            self._pairwise = lambda a, b: _cosine_distance(a, b, True)
+            self._normalize = True
         else:
             raise ValueError(
                 "Invalid metric; must be either 'euclidean' or 'cosine'")
         self.matching_threshold = matching_threshold
         self.budget = budget
-        self.samples = {}
+
+        # target -> row of the gallery, rows of removed targets are reused
+        self._slots = {}
+        self._free = []
+        # (targets, capacity, dim) samples, allocated on the first partial_fit
+        self._gallery = None
+        # number of samples ever added to each row, the ring position
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def samples(self):
+        capacity = self._gallery.shape[1] if self._gallery is not None else 0
+        return {target: self._gallery[slot, :min(self._counts[slot], capacity)]
+                for target, slot in self._slots.items()}
+
+    def _alloc(self, n_slots, capacity, dim, dtype):
+        """(Re)allocate the gallery, keeping the samples stored so far"""
+        gallery = np.zeros((n_slots, capacity, dim), dtype=dtype)
+        counts = np.zeros(n_slots, dtype=np.int64)
+        if self._gallery is not None:
+            old_slots, old_capacity = self._gallery.shape[:2]
+            gallery[:old_slots, :old_capacity] = self._gallery
+            counts[:old_slots] = self._counts
+        self._gallery, self._counts = gallery, counts
+
+    def _slot(self, target, dim, dtype):
+        slot = self._slots.get(target)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if self._gallery is None:
+                self._alloc(8, self.budget or 8, dim, dtype)
+            elif slot == len(self._gallery):
+                self._alloc(2 * slot, self._gallery.shape[1], dim, dtype)
+        self._counts[slot] = 0
+        self._slots[target] = slot
+        return slot
 
     def partial_fit(self, features, targets, active_targets):
         """Update the distance metric with new data.
@@ -147,11 +193,21 @@ class NearestNeighborDistanceMetric(object):
             A list of targets that are currently present in the scene.
 
         """
+        features = np.asarray(features)
+        if len(features) and self._normalize:
+            features = features / np.linalg.norm(features, axis=1, keepdims=True)
         for feature, target in zip(features, targets):
-            self.samples.setdefault(target, []).append(feature)
-            if self.budget is not None:
-                self.samples[target] = self.samples[target][-self.budget:]
-        self.samples = {k: self.samples[k] for k in active_targets}
+            slot = self._slot(target, len(feature), feature.dtype)
+            capacity = self._gallery.shape[1]
+            if self.budget is None and self._counts[slot] == capacity:
+                self._alloc(len(self._gallery), 2 * capacity, len(feature), self._gallery.dtype)
+                capacity *= 2
+            self._gallery[slot, self._counts[slot] % capacity] = feature
+            self._counts[slot] += 1
+
+        active_targets = set(active_targets)
+        for target in [t for t in self._slots if t not in active_targets]:
+            self._free.append(self._slots.pop(target))
 
     def distance(self, features, targets):
         """Compute distance between features and targets.
@@ -171,8 +227,20 @@ class NearestNeighborDistanceMetric(object):
             `targets[i]` and `features[j]`.
 
         """
-        cost_matrix = np.zeros((len(targets), len(features)))
-        for i, target in enumerate(targets):
-            # print("-----", self.samples[target][0].shape)
-            cost_matrix[i, :] = self._metric(self.samples[target], features)
-        return cost_matrix
+        if len(targets) == 0 or len(features) == 0:
+            return np.zeros((len(targets), len(features)))
+        features = np.asarray(features)
+        if self._normalize:
+            features = features / np.linalg.norm(features, axis=1, keepdims=True)
+        slots = np.array([self._slots[target] for target in targets])
+        # Rows up to the highest slot are one contiguous block of the
+        # gallery, compared in place instead of gathering the targets' rows
+        n_rows = slots.max() + 1
+        capacity, dim = self._gallery.shape[1:]
+        distances = self._pairwise(
+            self._gallery[:n_rows].reshape(-1, dim), features
+        ).reshape(n_rows, capacity, len(features))
+        # Rows fill from 0 before wrapping, so valid samples are a prefix
+        counts = np.minimum(self._counts[:n_rows], capacity)
+        distances[np.arange(capacity)[None, :] >= counts[:, None]] = np.inf
+        return distances.min(axis=1)[slots]
@@ -2,6 +2,156 @@
 import numpy as np
 import cv2
 
+try:
+    import torch
+except ImportError:
+    torch = None
+# Imported on its own: without torchvision, tensors still go through the
+# NumPy path and come back on their device
+try:
+    import torchvision
+except ImportError:
+    torchvision = None
+
+
+# Best remaining boxes resolved per step of the greedy suppression
+NMS_BLOCK = 64
+
+
+def _containment(a, b):
+    """Fraction of the area of the boxes `b` covered by the boxes `a`, both
+    (x1, y1, x2, y2) with inclusive pixel ranges. Broadcasts like arithmetic
+    on the leading dimensions."""
+    w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]) + 1
+    h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]) + 1
+    area = (b[..., 2] - b[..., 0] + 1) * (b[..., 3] - b[..., 1] + 1)
+    return np.maximum(0, w) * np.maximum(0, h) / area
+
+
+def _iou(a, b):
+    """Intersection over union of the boxes `a` and `b`, both (x1, y1, x2, y2).
+    Broadcasts like arithmetic on the leading dimensions."""
+    w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.maximum(0, w) * np.maximum(0, h)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter)
+
+
+def _offset_classes(boxes, classes):
+    """Shift the boxes of each class so boxes of different classes never overlap"""
+    if classes is None:
+        return boxes
+    _, labels = np.unique(np.asarray(classes), return_inverse=True)
+    span = boxes.max() - boxes.min() + 2
+    return boxes - boxes.min() + labels.reshape(-1, 1) * span
+
+
+def _greedy_suppression(boxes, order, max_overlap, overlap):
+    """Greedy NMS of `boxes` visited in `order`, returns the kept indices in
+    that order. `overlap(a, b)` gives how much `b` is covered by `a`; a box
+    is suppressed when a kept one covers it more than `max_overlap`.
+
+    Instead of one kept box per step, each step takes the NMS_BLOCK best
+    remaining boxes and resolves them among themselves by iterating
+
+        keep[j] = no kept i < j in the block covers j
+
+    until it is stable. Dependencies only point to better boxes, so the
+    fixed point is unique and equals the sequential greedy result. The
+    remaining boxes covered by the kept ones are then dropped at once,
+    looking only at the boxes whose x range can reach a kept box.
+    """
+    boxes = boxes[order]
+    # Boxes sorted on x1: the ones that can overlap box k start in
+    # [x1_k - widest box, x2_k + 1], a contiguous range of this order
+    by_x = np.argsort(boxes[:, 0], kind='stable')
+    x1_sorted = boxes[by_x, 0]
+    widest = (boxes[:, 2] - boxes[:, 0]).max() + 1
+
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    remaining = np.arange(len(boxes))
+    kept = []
+    while len(remaining):
+        head, remaining = remaining[:NMS_BLOCK], remaining[NMS_BLOCK:]
+        head_boxes = boxes[head]
+        covers = np.triu(overlap(head_boxes[:, None], head_boxes[None, :]) > max_overlap, 1)
+        keep = np.ones(len(head), dtype=bool)
+        while True:
+            new_keep = ~covers[keep].any(axis=0)
+            if np.array_equal(new_keep, keep):
+                break
+            keep = new_keep
+        kept.append(head[keep])
+        if not len(remaining):
+            break
+
+        # Forget the boxes decided so far so the x ranges only hold live ones
+        live = (by_x > head[-1]) & ~suppressed[by_x]
+        by_x, x1_sorted = by_x[live], x1_sorted[live]
+
+        kept_boxes = head_boxes[keep]
+        lo = np.searchsorted(x1_sorted, kept_boxes[:, 0] - widest, 'left')
+        hi = np.searchsorted(x1_sorted, kept_boxes[:, 2] + 1, 'right')
+        counts = hi - lo
+        pair_kept = np.repeat(np.arange(len(kept_boxes)), counts)
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        pair_box = by_x[starts + np.arange(len(pair_kept))]
+        covered = overlap(kept_boxes[pair_kept], boxes[pair_box]) > max_overlap
+        suppressed[pair_box[covered]] = True
+        remaining = remaining[~suppressed[remaining]]
+    return order[np.concatenate(kept)]
+
+
+def batched_nms(boxes, scores, iou_threshold, classes=None):
+    """Class-aware non-maximum suppression on intersection over union.
+
+    Same semantics as `torchvision.ops.batched_nms`, which is used for torch
+    tensors when torchvision is installed. Everything else goes through the
+    NumPy implementation.
+
+    Parameters
+    ----------
+    boxes : array_like
+        An Nx4 array or tensor of boxes (x1, y1, x2, y2).
+    scores : array_like
+        Detector confidence of each box.
+    iou_threshold : float
+        Boxes of the same class with a larger IoU than this value with a
+        higher scoring box are suppressed.
+    classes : Optional[array_like]
+        Class of each box. Boxes of different classes never suppress each
+        other. If None, all boxes are compared.
+
+    Returns
+    -------
+    ndarray | Tensor
+        Indices of the kept boxes in decreasing order of score, a tensor if
+        `boxes` is a tensor.
+
+    """
+    is_tensor = torch is not None and isinstance(boxes, torch.Tensor)
+    if is_tensor and torchvision is not None:
+        if classes is None:
+            return torchvision.ops.nms(boxes, scores, iou_threshold)
+        return torchvision.ops.batched_nms(boxes, scores, classes, iou_threshold)
+
+    if is_tensor:
+        device = boxes.device
+        boxes = boxes.detach().cpu().numpy()
+        scores = torch.as_tensor(scores).detach().cpu().numpy()
+        if classes is not None:
+            classes = torch.as_tensor(classes).detach().cpu().numpy()
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if len(boxes) == 0:
+        keep = np.zeros(0, dtype=np.int64)
+    else:
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        keep = _greedy_suppression(
+            _offset_classes(boxes, classes), order, iou_threshold, _iou)
+    return torch.as_tensor(keep, device=device) if is_tensor else keep
+
 
 def non_max_suppression(boxes, classes, max_bbox_overlap, scores=None):
     """Suppress overlapping detections.
@@ -11,19 +161,26 @@ def non_max_suppression(boxes, classes, max_bbox_overlap, scores=None):
     .. [1] http://www.pyimagesearch.com/2015/02/16/
            faster-non-maximum-suppression-python/
 
+    The overlap of a box is the fraction of its area covered by a higher
+    scoring box. Boxes are suppressed block-wise with overlap matrices
+    instead of one at a time, see `_greedy_suppression`.
+
     Examples
     --------
 
         >>> boxes = [d.roi for d in detections]
         >>> classes = [d.classes for d in detections]
         >>> scores = [d.confidence for d in detections]
-        >>> indices = non_max_suppression(boxes, max_bbox_overlap, scores)
+        >>> indices = non_max_suppression(boxes, classes, max_bbox_overlap, scores)
         >>> detections = [detections[i] for i in indices]
 
     Parameters
     ----------
     boxes : ndarray
         Array of ROIs (x, y, width, height).
+    classes : Optional[array_like]
+        Class of each ROI. ROIs of different classes never suppress each
+        other. If None, all ROIs are compared.
     max_bbox_overlap : float
         ROIs that overlap more than this values are suppressed.
     scores : Optional[array_like]
@@ -38,37 +195,15 @@ def non_max_suppression(boxes, classes, max_bbox_overlap, scores=None):
     if len(boxes) == 0:
         return []
 
-    boxes = boxes.astype(np.float)
-    pick = []
-
-    x1 = boxes[:, 0]
-    y1 = boxes[:, 1]
-    x2 = boxes[:, 2] + boxes[:, 0]
-    y2 = boxes[:, 3] + boxes[:, 1]
-
-    area = (x2 - x1 + 1) * (y2 - y1 + 1)
+    boxes = np.asarray(boxes, dtype=np.float64)
+    xyxy = np.c_[boxes[:, :2], boxes[:, :2] + boxes[:, 2:4]]
     if scores is not None:
         idxs = np.argsort(scores)
     else:
-        idxs = np.argsort(y2)
-
-    while len(idxs) > 0:
-        last = len(idxs) - 1
-        i = idxs[last]
-        pick.append(i)
-
-        xx1 = np.maximum(x1[i], x1[idxs[:last]])
-        yy1 = np.maximum(y1[i], y1[idxs[:last]])
-        xx2 = np.minimum(x2[i], x2[idxs[:last]])
-        yy2 = np.minimum(y2[i], y2[idxs[:last]])
-
-        w = np.maximum(0, xx2 - xx1 + 1)
-        h = np.maximum(0, yy2 - yy1 + 1)
-
-        overlap = (w * h) / area[idxs[:last]]
-
-        idxs = np.delete(
-            idxs, np.concatenate(
-                ([last], np.where(overlap > max_bbox_overlap)[0])))
+        idxs = np.argsort(xyxy[:, 3])
+    # Highest score first, ties in the same order as before
+    order = idxs[::-1]
 
-    return pick
+    pick = _greedy_suppression(
+        _offset_classes(xyxy, classes), order, max_bbox_overlap, _containment)
+    return pick.tolist()
@@ -60,6 +60,15 @@ class Track:
     features : List[ndarray]
         A cache of features. On each measurement update, the associated feature
         vector is added to this list.
+    latest_feature : Optional[ndarray]
+        Feature vector of the most recently associated detection.
+    expression : Optional[Any]
+        Facial expression of the most recently associated detection.
+    frames_cached : int
+        Number of consecutive updates with cached detections, i.e. since
+        the feature and expression were last computed for this track.
+    name_feature : Optional[ndarray]
+        Feature vector `name` was looked up with.
 
     """
 
@@ -76,10 +85,14 @@ class Track:
         self.features = []
         if feature is not None:
             self.features.append(feature)
+        self.latest_feature = feature
 
         self._n_init = n_init
         self._max_age = max_age
         self.name = name
+        self.name_feature = None
+        self.expression = None
+        self.frames_cached = 0
 
     def to_tlwh(self):
         """Get current position in bounding box format `(top left x, top left y,
@@ -113,7 +126,7 @@ class Track:
     def get_name(self):
         return self.name
 
-    def predict(self, kf):
+    def predict(self, kf, state=None):
         """Propagate the state distribution to the current time step using a
         Kalman filter prediction step.
 
@@ -121,13 +134,18 @@ class Track:
         ----------
         kf : kalman_filter.KalmanFilter
             The Kalman filter.
+        state : Optional[(ndarray, ndarray)]
+            Predicted mean and covariance already computed for this track by
+            `kf.multi_predict`. Computed here if None.
 
         """
-        self.mean, self.covariance = kf.predict(self.mean, self.covariance)
+        if state is None:
+            state = kf.predict(self.mean, self.covariance)
+        self.mean, self.covariance = state
         self.age += 1
         self.time_since_update += 1
 
-    def update(self, kf, detection):
+    def update(self, kf, detection, state=None):
         """Perform Kalman filter measurement update step and update the feature
         cache.
 
@@ -137,11 +155,22 @@ class Track:
             The Kalman filter.
         detection : Detection
             The associated detection.
+        state : Optional[(ndarray, ndarray)]
+            Corrected mean and covariance already computed for this track by
+            `kf.multi_update`. Computed here if None.
 
         """
-        self.mean, self.covariance = kf.update(
-            self.mean, self.covariance, detection.to_xyah())
-        self.features.append(detection.feature)
+        if state is None:
+            state = kf.update(self.mean, self.covariance, detection.to_xyah())
+        self.mean, self.covariance = state
+        if detection.cached:
+            # Same feature as before, it is already in the metric's gallery
+            self.frames_cached += 1
+        else:
+            self.features.append(detection.feature)
+            self.latest_feature = detection.feature
+            self.expression = detection.expression
+            self.frames_cached = 0
 
         self.hits += 1
         self.time_since_update = 0
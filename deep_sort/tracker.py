@@ -51,9 +51,16 @@ class Tracker:
         """Propagate track state distributions one time step forward.
 
         This function should be called once every time step, before `update`.
+        All tracks are predicted in one batch, each track keeps a row of the
+        stacked result as its state.
         """
-        for track in self.tracks:
-            track.predict(self.kf)
+        if not self.tracks:
+            return
+        mean, covariance = self.kf.multi_predict(
+            np.asarray([t.mean for t in self.tracks]),
+            np.asarray([t.covariance for t in self.tracks]))
+        for i, track in enumerate(self.tracks):
+            track.predict(self.kf, (mean[i], covariance[i]))
 
     def update(self, detections):
         """Perform measurement update and track management.
@@ -68,10 +75,16 @@ class Tracker:
         matches, unmatched_tracks, unmatched_detections = \
             self._match(detections)
 
-        # Update track set.
-        for track_idx, detection_idx in matches:
-            self.tracks[track_idx].update(
-                self.kf, detections[detection_idx])
+        # Update track set, the matched tracks are corrected in one batch.
+        if matches:
+            mean, covariance = self.kf.multi_update(
+                np.asarray([self.tracks[i].mean for i, _ in matches]),
+                np.asarray([self.tracks[i].covariance for i, _ in matches]),
+                np.asarray([detections[j].to_xyah() for _, j in matches]))
+            for k, (track_idx, detection_idx) in enumerate(matches):
+                self.tracks[track_idx].update(
+                    self.kf, detections[detection_idx],
+                    (mean[k], covariance[k]))
         for track_idx in unmatched_tracks:
             self.tracks[track_idx].mark_missed()
         for detection_idx in unmatched_detections:
@@ -137,7 +150,9 @@ class Tracker:
     def _initiate_track(self, detection):
         mean, covariance = self.kf.initiate(detection.to_xyah())
         name = detection.get_name()
-        self.tracks.append(Track(
+        track = Track(
             mean, covariance, self._next_id, self.n_init, self.max_age,
-            detection.feature, name))
+            detection.feature, name)
+        track.expression = detection.expression
+        self.tracks.append(track)
         self._next_id += 1
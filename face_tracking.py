@@ -1,9 +1,12 @@
 import datetime
-from io import BytesIO
 import cv2
 import requests
 import numpy as np
-from PIL import Image
+
+from src.frame_codec import get_encoder
+
+# the timestamp row is read back by the server, so the format must be lossless
+frame_encoder = get_encoder("png", compression=1)
 
 
 def convert_frame(frame):
@@ -28,11 +31,8 @@ def convert_frame(frame):
     modified_image = np.concatenate((frame, empty_arr), axis=0)
     # byte_array = modified_image.tobytes(order="C")
 
-    send_image = Image.fromarray(modified_image)
-    image2bytes = BytesIO()
-    send_image.save(image2bytes, format="PNG")
-    image2bytes.seek(0)
-    return image2bytes.read()
+    # channels go out in the array order, as PIL used to write them
+    return frame_encoder.encode(modified_image, bgr=False)
 
 def draw_keypoints(frame, keypoints):
     for point in keypoints[0]['keypoints'][0]:
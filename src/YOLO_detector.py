@@ -1,11 +1,10 @@
 import datetime
-from io import BytesIO
 import numpy as np
-from PIL import Image
 import requests
 import torch
 
 from func import *
+from src.frame_codec import encoder_for
 
 
 def get_area_detect(img, points):
@@ -90,33 +89,39 @@ class Detector(object):
         """
         
         self.link = link
+        self.encoder = encoder_for("LaneDetection")
+        self.watermark_buf = None
     
     def convert_frame(self, frame):
-        current_time = int(datetime.datetime.now().timestamp())
-
-        map_time = list(map(int, str(current_time)))
-        remainder = frame.shape[0] % 10
-        quotient = frame.shape[0] // 10
-
-        output = quotient * map_time
-        output.extend(map_time[:remainder])
-
-        add_array = np.array(output)
-        add_array = add_array.reshape(1, -1, 1)
-
-        empty_arr = np.zeros_like(frame[:1])
+        """Encode `frame` with one extra bottom row carrying the timestamp digits.
 
-        empty_arr[:, : add_array.shape[1]] = add_array
-
-        # Create a new image with the last row as add_array
-        modified_image = np.concatenate((frame, empty_arr), axis=0)
-        # byte_array = modified_image.tobytes(order="C")
-
-        send_image = Image.fromarray(modified_image)
-        image2bytes = BytesIO()
-        send_image.save(image2bytes, format="PNG")
-        image2bytes.seek(0)
-        return image2bytes.read()
+        The frame and its watermark row are written into an (H+1)xWxC buffer
+        kept across calls, so nothing of the frame size is allocated here.
+        """
+        current_time = int(datetime.datetime.now().timestamp())
+        h, w = frame.shape[:2]
+
+        out_shape = (h + 1,) + frame.shape[1:]
+        if self.watermark_buf is None or self.watermark_buf.shape != out_shape or self.watermark_buf.dtype != frame.dtype:
+            self.watermark_buf = np.empty(out_shape, frame.dtype)
+        out = self.watermark_buf
+
+        # Channels are stored reversed so the encoder writes them in array
+        # order, as PIL used to
+        if frame.ndim == 3:
+            np.copyto(out[:h], frame[..., ::-1])
+        else:
+            np.copyto(out[:h], frame)
+
+        # Digits repeated height // 10 times, then the first height % 10 of them
+        digits = np.frombuffer(str(current_time).encode(), np.uint8) - ord("0")
+        n = min((h // 10) * len(digits) + min(h % 10, len(digits)), w)
+        row = out[h]
+        row[n:] = 0
+        pattern = np.tile(digits, -(-n // len(digits)))[:n]
+        row[:n] = pattern.reshape((n,) + (1,) * (row.ndim - 1))
+
+        return self.encoder.encode(out)
 
     def detect(self, image):
         image_data = self.convert_frame(image)
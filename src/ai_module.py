@@ -1,31 +1,31 @@
-import re
 import time
-from io import BytesIO
 
 import cv2
 import numpy as np
-import requests
-from deep_sort import nn_matching
+from deep_sort import iou_matching, nn_matching
 from deep_sort.detection import Detection
 from deep_sort.tracker import Tracker
 from numpy.linalg import norm
-from PIL import Image
-from pymilvus import Collection, connections, db
 from PyQt5 import QtCore, QtWidgets
+from src.db_manager import db_manager
+from src.face_index import FaceIdentityIndex, search_faces
+from src.frame_codec import ENDPOINT_ENCODERS, encoder_for
+from src.http_client import InferenceClient
 from ui.ui_mainwindow import Ui_MainWindow
 
 program_start_time = time.time()
 
 max_cosine_distance = 0.4
-nn_budget = None
-metric = nn_matching.NearestNeighborDistanceMetric(
-    "cosine", max_cosine_distance, nn_budget
-)
-
-# MILVUS DATABASE
-conn = connections.connect(host="10.37.239.102", port=19530)
-db.using_database("face_recognition")
-collection = Collection("face_recognition")
+# appearance samples kept per track by the tracker metric
+nn_budget = 100
+# squared L2 distance above which a face is unknown, None keeps the nearest face
+max_face_distance = None
+# frames a confirmed face track reuses its FaceRecognition and FaceExpression results
+face_refresh_interval = 10
+# IoU between a face box and the predicted box of a track needed to reuse its results
+face_cache_iou = 0.5
+# cosine distance from the embedding a track was named with above which it is looked up again
+identity_drift = 0.2
 
 
 class AI(QtCore.QObject):
@@ -33,124 +33,243 @@ class AI(QtCore.QObject):
         super().__init__(parent)
         self.ui: Ui_MainWindow = parent.ui
 
-        # initialize tracker
-        self.tracker = Tracker(metric)
-
-    def convert_frame(self, frame):
-        send_image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        image2bytes = BytesIO()
-        send_image.save(image2bytes, format="PNG")
-        image2bytes.seek(0)
-        return image2bytes.read()
-
-    def compare_emb(self, api_output):
-        vectors_to_search = api_output
+        # pooled keep-alive connections to the model server
+        self.client = InferenceClient()
+        # frame encoder per endpoint, see src/frame_codec.ENDPOINT_ENCODERS
+        self.encoders = {}
+        # FaceDetection urls that answered a multipart batch with something else
+        self.unbatched_urls = set()
 
-        search_params = {
-            "metric_type": "L2",
-            "params": {"nprobe": 10},
-        }
+        # enrolled faces mirrored from Milvus, refreshed in the background
+        self.face_index = FaceIdentityIndex()
 
-        result = [
-            str(
-                collection.search(
-                    vectors_to_search,
-                    "face_vector",
-                    search_params,
-                    limit=1,
-                    output_fields=["face_id"],
-                )
-            )
-        ]
+        # initialize tracker
+        self.tracker = self.create_tracker()
 
-        # Extracting the 'id' value using regular expression
-        match = re.search(r"id: (\d+)", result[0])
+    @staticmethod
+    def create_tracker() -> Tracker:
+        """New tracker with its own appearance metric, one per camera"""
+        metric = nn_matching.NearestNeighborDistanceMetric(
+            "cosine", max_cosine_distance, nn_budget
+        )
+        return Tracker(metric)
 
-        # Check if the match is found
-        if match:
-            id_value = match.group(1)
+    def get_url(self, model_name: str) -> str:
+        server_IP = str(self.ui.comboBoxServerIP.currentText())
+        return f"http://{server_IP}:8090/predictions/{model_name}"
+
+    def convert_frame(self, frame, endpoint: str = "FaceDetection") -> bytes:
+        """Encode a BGR frame with the wire format configured for `endpoint`"""
+        if endpoint not in self.encoders:
+            self.encoders[endpoint] = encoder_for(endpoint)
+        return self.encoders[endpoint].encode(frame)
+
+    def compare_emb(self, embeddings) -> list:
+        """Identity of each embedding row, None for an unknown face.
+
+        The local index answers once it is loaded, until then all the
+        embeddings of the frame go to Milvus in a single search.
+        """
+        vectors = np.asarray(embeddings, np.float32)
+        vectors = vectors.reshape(len(vectors), -1)
+        if len(vectors) == 0:
+            return []
+
+        collection = db_manager.face_collection()
+        if collection is not None:
+            self.face_index.maybe_sync(collection)
+
+        if self.face_index.ready:
+            ids, distances = self.face_index.search(vectors)
+            matches = [(i[0], d[0]) for i, d in zip(ids, distances)]
+        elif collection is not None:
+            try:
+                matches = search_faces(collection, vectors)
+            except Exception:
+                db_manager.invalidate_milvus()
+                return [None] * len(vectors)
         else:
-            id_value = None
+            # Still connecting, the tracks are looked up again next frame
+            return [None] * len(vectors)
+
+        return [
+            face_id if max_face_distance is None or distance <= max_face_distance else None
+            for face_id, distance in matches
+        ]
 
-        return id_value
+    def detect_faces_batch(self, images: list) -> list:
+        """Run FaceDetection on several encoded frames with a single request.
+
+        Frames are sent as one multipart request and the server is expected
+        to answer with a list holding one `{"bbox": boxes}` per part, in
+        order. If it does not (handler without batch support), the frames
+        are sent one by one instead and the server is not asked for a batch
+        again.
+        """
+        url = self.get_url("FaceDetection")
+        if len(images) == 1 or url in self.unbatched_urls:
+            return [self.detect_faces(image) for image in images]
+
+        files = {f"frame{i}": image for i, image in enumerate(images)}
+        results = self.client.post_json("FaceDetection", url, files=files)
+        if (
+            isinstance(results, list) and len(results) == len(images)
+            and all(isinstance(result, dict) and "bbox" in result for result in results)
+        ):
+            return [result["bbox"] for result in results]
+        if results is not None:
+            # The server answered, but not with one result per frame
+            self.unbatched_urls.add(url)
+        return [self.detect_faces(image) for image in images]
+
+    def detect_faces(self, image_data: bytes) -> list:
+        """FaceDetection on one encoded frame, the server answers `[{"bbox": boxes}]`"""
+        result = self.client.post_json("FaceDetection", self.get_url("FaceDetection"), data=image_data)
+        if result:
+            return result[0]["bbox"]
+        return []
 
     def do_object_detection(self, frame: np.ndarray):
         image_data = self.convert_frame(frame)
-        server_IP = str(self.ui.comboBoxServerIP.currentText())
-
-        face_detection_URL = f"http://{server_IP}:8090/predictions/FaceDetection"
-        face_recognition_URL = f"http://{server_IP}:8090/predictions/FaceRecognition"
-        face_expression_URL = f"http://{server_IP}:8090/predictions/FaceExpression"
-        human_keypoint_URL = f"http://{server_IP}:8090/predictions/HumanPose"
-        action_recognition_URL = (
-            f"http://{server_IP}:8090/predictions/ActionRecognition"
-        )
+        boxes = self.detect_faces(image_data)
+        return self.process_faces(frame, image_data, boxes, self.tracker)
+
+    @staticmethod
+    def identity_drifted(track) -> bool:
+        """True if the face of a named track no longer looks like the one it was named with"""
+        if track.name is None or track.name_feature is None:
+            return False
+        a, b = track.latest_feature, track.name_feature
+        return 1.0 - np.dot(a, b) / (norm(a) * norm(b)) > identity_drift
+
+    def resolve_identities(self, tracker: Tracker) -> None:
+        """Name the tracks that got a new embedding this frame and don't have
+        an identity yet, or whose face drifted away from the one they were
+        named with.
+
+        The name is kept on the track, so a face is only looked up until its
+        track has one instead of on every frame.
+        """
+        lookup = [
+            track for track in tracker.tracks
+            if track.time_since_update == 0 and track.frames_cached == 0 and track.latest_feature is not None
+            and (track.name is None or self.identity_drifted(track))
+        ]
+        if not lookup:
+            return
+        names = self.compare_emb([track.latest_feature for track in lookup])
+        for track, name in zip(lookup, names):
+            if name is not None:
+                track.name = name
+                track.name_feature = track.latest_feature
+
+    @staticmethod
+    def match_cached_tracks(tracker: Tracker, boxes: list) -> dict:
+        """Box index -> confirmed track whose face results can be reused for it.
+
+        The predicted box of the track and the face box must be each other's
+        best overlap, the track must have been seen last frame and its results
+        be younger than `face_refresh_interval` frames.
+        """
+        tracks = [
+            track for track in tracker.tracks
+            if track.is_confirmed() and track.time_since_update == 1
+            and track.latest_feature is not None and track.expression is not None
+            and track.frames_cached + 1 < face_refresh_interval
+        ]
+        if not tracks or not boxes:
+            return {}
+        tlwhs = np.array([[x1, y1, x2 - x1, y2 - y1] for x1, y1, x2, y2 in boxes], dtype=np.float64)
+        ious = np.array([iou_matching.iou(track.to_tlwh(), tlwhs) for track in tracks])
+        best_box, best_track = ious.argmax(axis=1), ious.argmax(axis=0)
+        return {
+            int(box): tracks[i]
+            for i, box in enumerate(best_box)
+            if best_track[box] == i and ious[i, box] >= face_cache_iou
+        }
 
-        face_detection_response = requests.post(face_detection_URL, data=image_data)
-        human_keypoint_response = requests.post(human_keypoint_URL, data=image_data)
+    def process_faces(self, frame: np.ndarray, image_data: bytes, boxes: list, tracker: Tracker):
+        """Recognize detected faces, update `tracker` and draw the tracks.
+
+        HumanPose is requested once for the frame and the recognition and
+        expression requests of every face are all in flight together, so the
+        frame waits for the slowest call only. Faces at the predicted place
+        of a confirmed track reuse its results until they are
+        `face_refresh_interval` frames old, so requests scale with new faces
+        rather than with faces in view.
+        """
+        face_recognition_URL = self.get_url("FaceRecognition")
+        face_expression_URL = self.get_url("FaceExpression")
+        human_keypoint_URL = self.get_url("HumanPose")
+        action_recognition_URL = self.get_url("ActionRecognition")
+
+        # image_data was encoded for FaceDetection, reuse it if HumanPose takes the same format
+        if ENDPOINT_ENCODERS.get("HumanPose") != ENDPOINT_ENCODERS.get("FaceDetection"):
+            image_data = self.convert_frame(frame, "HumanPose")
+        human_keypoint_future = self.client.submit("HumanPose", human_keypoint_URL, data=image_data)
+
+        boxes = [list(map(int, box)) for box in boxes]
+        tracker.predict()
+        cached = self.match_cached_tracks(tracker, boxes)
+
+        face_requests = []
+        for i, box in enumerate(boxes):
+            if i in cached:
+                face_requests.append((box, None, None))
+                continue
+            face = frame[box[1] : box[3], box[0] : box[2]]
+            # cv2.imwrite("face.jpg", face)
 
-        if face_detection_response.status_code == 200:
-            face_detection_result = face_detection_response.json()
-            boxes = face_detection_result[0]["bbox"]
+            face_data = self.convert_frame(face, "FaceRecognition")
+            expression_data = face_data
+            if ENDPOINT_ENCODERS.get("FaceExpression") != ENDPOINT_ENCODERS.get("FaceRecognition"):
+                expression_data = self.convert_frame(face, "FaceExpression")
+            face_requests.append((
+                box,
+                self.client.submit("FaceRecognition", face_recognition_URL, data=face_data),
+                self.client.submit("FaceExpression", face_expression_URL, data=expression_data),
+            ))
 
         dets = []
-        fers = []
 
-        for box in boxes:
-            box = list(map(int, box))
+        for i, (box, recognition_future, expression_future) in enumerate(face_requests):
             x = box[0]
             y = box[1]
             w = box[2] - box[0]
             h = box[3] - box[1]
 
-            face = frame[box[1] : box[3], box[0] : box[2]]
-            # cv2.imwrite("face.jpg", face)
-
-            face_data = self.convert_frame(face)
-
-            # face_recog_start_time = time.time()
-            face_recognition_response = requests.post(
-                face_recognition_URL, data=face_data
-            )
-
-            face_expression_response = requests.post(
-                face_expression_URL, data=face_data
-            )
-
-            if (
-                face_recognition_response.status_code == 200
-                and face_expression_response.status_code == 200
-            ):
-                face_recognition_result = face_recognition_response.json()
-                emb = face_recognition_result["output"]
+            if recognition_future is None:
+                track = cached[i]
+                dets.append(Detection([x, y, w, h], None, track.latest_feature, track.expression, cached=True))
+                continue
 
-                face_expression_result = face_expression_response.json()
-                expression = face_expression_result["output"]
+            face_recognition_result = recognition_future.result()
+            face_expression_result = expression_future.result()
+            if face_recognition_result is None or face_expression_result is None:
+                continue
 
-                fers.append(expression)
-                user_name = self.compare_emb(emb)
+            emb = face_recognition_result["output"]
+            expression = face_expression_result["output"]
 
-                dets.append(Detection([x, y, w, h], user_name, np.array(emb).flatten()))
+            dets.append(Detection([x, y, w, h], None, np.array(emb).flatten(), expression))
 
-            human_keypoint_response = requests.post(human_keypoint_URL, data=image_data)
-            if human_keypoint_response.status_code == 200:
-                human_keypoint = np.array(
-                    human_keypoint_response.json()[0]["keypoints"]
-                )
-                human_bboxes = human_keypoint_response.json()[0]["bbox"]
-                # print(human_keypoint_response.json())
+        human_keypoint_result = human_keypoint_future.result()
+        if human_keypoint_result:
+            human_keypoint = np.array(human_keypoint_result[0]["keypoints"])
+            human_bboxes = human_keypoint_result[0]["bbox"]
 
-                # for keypoint, human_box in zip(human_keypoint, human_bboxes):
-                #     print(keypoint[:, :2].tolist())
-                #     print(human_box)
+            # for keypoint, human_box in zip(human_keypoint, human_bboxes):
+            #     print(keypoint[:, :2].tolist())
+            #     print(human_box)
 
-        self.tracker.predict()
-        self.tracker.update(dets)
+        tracker.update(dets)
+        self.resolve_identities(tracker)
 
         # update tracks
-        for track, ex in zip(self.tracker.tracks, fers):
+        for track in tracker.tracks:
             if not track.is_confirmed() or track.time_since_update > 1:
                 continue
+            ex = track.expression
 
             bbox = track.to_tlbr()
             name = track.get_name()
@@ -168,7 +287,7 @@ class AI(QtCore.QObject):
             cv2.rectangle(
                 frame,
                 (int(bbox[0]), int(bbox[1] - 30)),
-                (int(bbox[0]) + (len(name)) * 15, int(bbox[1])),
+                (int(bbox[0]) + (len(str(name))) * 15, int(bbox[1])),
                 color,
                 -1,
             )
@@ -181,8 +300,4 @@ class AI(QtCore.QObject):
                 (255, 255, 255),
                 2,
             )
-            cv2.imwrite("output_frame.jpg", frame)
-            return frame
-        else:
-            # Handle non-200 responses if needed
-            pass
+        return frame
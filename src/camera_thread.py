@@ -2,12 +2,16 @@ import contextlib
 import datetime
 import os
 import sys
+import time
 
 import cv2
 import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 
+from src.frame_buffer import FrameRingBuffer
+from src.roi_mask import ROIMask
+
 ci_build_and_not_headless = False
 
 with contextlib.suppress(Exception):
@@ -23,32 +27,45 @@ if sys.platform.startswith("linux") and ci_and_not_headless:
 class Worker(QtCore.QThread):
     send_frame = QtCore.pyqtSignal(np.ndarray)
     send_update_status = QtCore.pyqtSignal(str, bool)
-    send_data_to_consumer = QtCore.pyqtSignal(dict, np.ndarray, np.ndarray)
     error_occurred = QtCore.pyqtSignal(str)
     finished = QtCore.pyqtSignal()
 
-    def __init__(self, parent, *args, data: dict, mutex, wait_condition, **kwargs):
+    def __init__(self, parent, *args, data: dict, buffer: FrameRingBuffer, mutex, wait_condition, **kwargs):
         QtCore.QThread.__init__(self, *args, **kwargs)
         self.p = parent
         self.data = data
         self.name = data["CAM NAME"]
         self.ip = data["IP"]
         self.zone = data["ZONE"]
-        self.coord = np.array(data["COORD"])
+        self.roi = ROIMask(data["COORD"])
         self.index = data["INDEX"]
+        self.frame_interval = self.get_frame_interval(data)
 
         self._interupted = False
         self.black_frame = np.zeros((480, 640, 3), np.uint8)
-        self.violation_frame = None
+        self.buffer = buffer
         self.pause = False
         self.mutex = mutex
         self.wait_condition = wait_condition
 
     def reinit_params(self, data: dict):
+        self.data = data
         self.name = data["CAM NAME"]
         self.ip = data["IP"]
         self.zone = data["ZONE"]
-        self.coord = np.array(data["COORD"])
+        self.roi.set_coord(data["COORD"])
+        self.frame_interval = self.get_frame_interval(data)
+
+    @staticmethod
+    def get_frame_interval(data: dict) -> float:
+        """Seconds between retrieved frames, 0 means retrieve every frame"""
+        try:
+            fps = float(data.get("FPS", 0))
+        except (TypeError, ValueError):
+            return 0.0
+        if not fps > 0:
+            return 0.0
+        return 1.0 / fps
 
     def interupted(self):
         self._interupted = True
@@ -70,21 +87,27 @@ class Worker(QtCore.QThread):
         finally:
             self.send_update_status.emit(self.name, cap.isOpened())
 
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-            self.coord *= np.array([width, height])
-            self.coord = self.coord.reshape((-1, 1, 2))
-
+            next_retrieve = 0.0
             while True:
-                has, img = cap.read()
-                if not has:
+                # grab() keeps the stream drained, the conversion and copy in
+                # retrieve() are only paid for frames at the target FPS
+                if not cap.grab():
                     break
 
                 if self._interupted:
                     break
 
-                self.violation_frame = img.copy()
+                now = time.monotonic()
+                if now < next_retrieve:
+                    continue
+                next_retrieve = max(next_retrieve + self.frame_interval, now)
+
+                has, img = cap.retrieve()
+                if not has:
+                    break
+
+                # The ROI crop is written straight into the shared slot below
+                slot = self.buffer.begin_write(self.roi.crop_shape(img.shape))
 
                 # current_time = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
                 # text = f"{self.name} {self.zone} {current_time}"
@@ -98,12 +121,12 @@ class Worker(QtCore.QThread):
                 #     thickness=2,
                 # )
 
-                pts = np.array(self.coord, dtype=np.int32)
+                pts = self.roi.get(img.shape)[0]
                 frame = cv2.polylines(img, [pts], True, (0, 255, 0), 2)
 
-                mask = np.zeros_like(img)
-                cv2.fillPoly(mask, [pts], (255, 255, 255))
-                img = cv2.bitwise_and(img, mask)
+                # Consumer only gets the masked bounding box of the ROI
+                self.roi.apply(img, dst=slot.frame)
+                self.buffer.commit_write(slot, self.data)
 
                 if not self.pause:
                     self.mutex.lock()
@@ -111,15 +134,12 @@ class Worker(QtCore.QThread):
                     self.wait_condition.wait(self.mutex, 50)
                     self.mutex.unlock()
                     last_frame = frame
-                self.send_data_to_consumer.emit(self.data, img, self.violation_frame)
 
             cap.release()
             self._interupted = True
             self.send_update_status.emit(self.name, False)
             self.send_frame.emit(last_frame)
-            self.send_data_to_consumer.emit(
-                self.data, self.black_frame, self.black_frame
-            )
+            self.buffer.reset()
 
             if self._interupted:
                 self.reconnect()
@@ -132,7 +152,6 @@ class Worker(QtCore.QThread):
                 cap = cv2.VideoCapture(self.ip)
 
                 if cap.isOpened():
-                    self.coord = np.array(self.data["COORD"])
                     self.send_update_status.emit(self.name, True)
                     self._interupted = False
                     self.run()  # Restart the run loop
@@ -144,9 +163,7 @@ class Worker(QtCore.QThread):
                 )
                 self.send_update_status.emit(self.name, False)
                 self.send_frame.emit(self.black_frame)
-                self.send_data_to_consumer.emit(
-                    self.data, self.black_frame, self.black_frame
-                )
+                self.buffer.reset()
                 self.finished.emit()
 
     def handle_stop(self, state: bool):
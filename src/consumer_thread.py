@@ -1,73 +1,144 @@
-import json
 import time
-from datetime import datetime
-import traceback
-import cv2
+from threading import Lock
 
 import numpy as np
-import pymongo
 from PyQt5 import QtCore, QtWidgets
 
 from src.ai_module import AI
+from src.frame_buffer import FrameRingBuffer
 from ui.ui_mainwindow import Ui_MainWindow
 
-merged_json = {}
 
-class Consumer(QtCore.QThread):
-    active_instance = []
+class InferenceScheduler(QtCore.QThread):
+    """Single consumer for all cameras.
+
+    Collects the newest ROI frame of every camera buffer, sends up to
+    `max_batch_size` of them to the model server in one request (waiting at
+    most `batch_timeout` seconds for the batch to fill) and fans the results
+    back out to a tracker kept per camera.
+    """
+
+    MAX_BATCH_SIZE = 8
+    BATCH_TIMEOUT = 0.05  # seconds
+
     finished = QtCore.pyqtSignal()
-    send_predicted_frame = QtCore.pyqtSignal(np.ndarray)
-    
-    def __init__(self, parent: QtWidgets.QMainWindow, mutex, wait_condition):
+    send_predicted_frame = QtCore.pyqtSignal(str, np.ndarray)
+
+    def __init__(
+        self,
+        parent: QtWidgets.QMainWindow,
+        mutex,
+        wait_condition,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        batch_timeout: float = BATCH_TIMEOUT,
+    ):
         super().__init__(parent)
         self.p: QtWidgets.QMainWindow = parent
         self.ui: Ui_MainWindow = parent.ui
         self._is_running: bool = True
         self.ai = AI(self.p)
-        self.data = None
-        self.frame = None
-        self.violation_image = None
         self.mutex = mutex
         self.wait_condition = wait_condition
-        
-        self.reset_interval = 60
-        self.last_reset_time = None
-        self.merged_data = {}
-    
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout
+
+        self._cameras = {}
+        self._cameras_lock = Lock()
+        self._display_cameras = set()
+        self._next_camera = 0
+
+    def add_camera(self, cam_name: str, buffer: FrameRingBuffer) -> None:
+        """Register (or re-register) a camera, its tracker starts fresh"""
+        with self._cameras_lock:
+            self._cameras[cam_name] = {
+                "buffer": buffer,
+                "last_seq": 0,
+                "tracker": self.ai.create_tracker(),
+            }
+
+    def remove_camera(self, cam_name: str) -> None:
+        with self._cameras_lock:
+            self._cameras.pop(cam_name, None)
+            self._display_cameras.discard(cam_name)
+
+    def set_display_camera(self, cam_name: str, show: bool) -> None:
+        """Only cameras shown maximized get their predicted frame emitted"""
+        if show:
+            self._display_cameras.add(cam_name)
+        else:
+            self._display_cameras.discard(cam_name)
+
+    def buffer_stats(self) -> dict:
+        with self._cameras_lock:
+            return {name: cam["buffer"].stats() for name, cam in self._cameras.items()}
+
+    def collect_batch(self) -> list:
+        """Pin the newest unseen frame of up to `max_batch_size` cameras"""
+        batch = []
+        taken = set()
+        deadline = time.monotonic() + self.batch_timeout
+        while self._is_running:
+            with self._cameras_lock:
+                cameras = list(self._cameras.items())
+            # Rotate the start so cameras past the batch size are not starved
+            if cameras:
+                start = self._next_camera % len(cameras)
+                cameras = cameras[start:] + cameras[:start]
+
+            for cam_name, cam in cameras:
+                if cam_name in taken or len(batch) >= self.max_batch_size:
+                    continue
+                slot = cam["buffer"].acquire_latest(cam["last_seq"])
+                if slot is None:
+                    continue
+                cam["last_seq"] = slot.seq
+                taken.add(cam_name)
+                batch.append((cam_name, cam, slot))
+
+            if len(batch) >= min(self.max_batch_size, len(cameras)) and batch:
+                break
+            if time.monotonic() >= deadline:
+                break
+            self.mutex.lock()
+            self.wait_condition.wait(self.mutex, 5)
+            self.mutex.unlock()
+
+        self._next_camera += len(batch)
+        return batch
+
     def run(self) -> None:
-        self.last_reset_time = int(time.time())
-        
         while self._is_running:
-            try:                
-                frame = self.frame.copy()
-                violation = self.violation_image.copy()
-                coord = np.array(self.data["COORD"])
-                coord *= np.array([frame.shape[1], frame.shape[0]])
-                coord = coord.reshape((-1, 1, 2))
-                pts = np.array(coord, dtype=np.int32)
-                lst = [tuple(coord[0]) for coord in pts]
-                
-                predicted_frame = self.ai.do_object_detection(frame)
-                self.send_predicted_frame.emit(predicted_frame)
-                # del frame, violation
+            batch = self.collect_batch()
+            if not batch:
+                continue
+            try:
+                frames = [slot.frame for _, _, slot in batch]
+                images = [self.ai.convert_frame(frame) for frame in frames]
+                boxes_lst = self.ai.detect_faces_batch(images)
+
+                for (cam_name, cam, slot), image_data, boxes in zip(batch, images, boxes_lst):
+                    try:
+                        predicted_frame = self.ai.process_faces(
+                            slot.frame, image_data, boxes, cam["tracker"]
+                        )
+                    except Exception:
+                        # traceback.print_exc()
+                        continue
+                    # The slot is reused by the worker after release, only copy
+                    # the result when the camera is being displayed
+                    if cam_name in self._display_cameras:
+                        self.send_predicted_frame.emit(cam_name, predicted_frame.copy())
 
             except Exception:
                 # traceback.print_exc()
                 pass
-            
-            self.mutex.lock()
-            self.wait_condition.wait(self.mutex, 50)
-            self.mutex.unlock()
-            
+            finally:
+                for _, cam, slot in batch:
+                    cam["buffer"].release(slot)
+
+        self.ai.client.close()
         self.finished.emit()
 
     def taskStop(self):
         self._is_running = False
         self.quit()
-
-    # Slot to update data from producers
-    @QtCore.pyqtSlot(dict, np.ndarray, np.ndarray)
-    def update_data_to_buffer(self, data: dict, frame: np.ndarray, violation_image: np.ndarray):
-        self.data = data
-        self.frame = frame
-        self.violation_image = violation_image
\ No newline at end of file
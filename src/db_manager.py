@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import time
+from threading import Lock, Thread
+
+from pymilvus import Collection, connections, db
+from pymongo import MongoClient
+
+MILVUS_PORT = 19530
+MILVUS_DATABASE = "face_recognition"
+MILVUS_COLLECTION = "face_recognition"
+
+MONGO_PORT = 9999
+MONGO_DATABASE = "vehicles_db"
+
+
+class DatabaseManager:
+    """Milvus and MongoDB connections for the server picked in comboBoxServerIP.
+
+    Nothing is connected at import or startup. Connections are opened the
+    first time they are needed, Milvus in a background thread so callers
+    never wait for it, and dropped connections are reopened on the next use
+    after `retry_interval` seconds. Switching server closes the old ones.
+    """
+
+    def __init__(self, retry_interval: float = 5.0, timeout: float = 5.0) -> None:
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        self._lock = Lock()
+        self.server_ip = None
+        self._mongo_client = None
+        self._milvus_alias = None
+        self._collection = None
+        self._connect_thread = None
+        self._last_attempt = 0.0
+
+    def set_server(self, server_ip: str) -> None:
+        """Use the databases on `server_ip` and start connecting to Milvus"""
+        with self._lock:
+            if server_ip == self.server_ip:
+                return
+            self._close()
+            self.server_ip = server_ip
+            self._last_attempt = 0.0
+        self.connect_async()
+
+    def mongo_db(self):
+        """MongoDB database of the current server.
+
+        pymongo connects and reconnects in its own background threads, so
+        this returns at once and the first query waits for the server.
+        """
+        with self._lock:
+            if self.server_ip is None:
+                raise RuntimeError("No database server selected")
+            if self._mongo_client is None:
+                self._mongo_client = MongoClient(
+                    f"mongodb://{self.server_ip}:{MONGO_PORT}",
+                    serverSelectionTimeoutMS=int(self.timeout * 1000),
+                )
+            return self._mongo_client[MONGO_DATABASE]
+
+    def ping_mongo(self) -> None:
+        """Wait for MongoDB to answer, raises ServerSelectionTimeoutError after `timeout`"""
+        self.mongo_db().client.admin.command("ping")
+
+    def face_collection(self):
+        """Milvus face collection, or None while it is (re)connecting"""
+        with self._lock:
+            collection = self._collection
+        if collection is None:
+            self.connect_async()
+        return collection
+
+    def invalidate_milvus(self) -> None:
+        """Forget the Milvus connection after a failed call, reconnect on next use"""
+        with self._lock:
+            self._close_milvus()
+
+    def connect_async(self) -> None:
+        with self._lock:
+            if self.server_ip is None or self._collection is not None:
+                return
+            if self._connect_thread is not None and self._connect_thread.is_alive():
+                return
+            if time.monotonic() - self._last_attempt < self.retry_interval:
+                return
+            self._last_attempt = time.monotonic()
+            self._connect_thread = Thread(target=self._connect_milvus, args=(self.server_ip,), daemon=True)
+            self._connect_thread.start()
+
+    def _connect_milvus(self, server_ip: str) -> None:
+        alias = f"lancs-{server_ip}"
+        try:
+            connections.connect(alias=alias, host=server_ip, port=MILVUS_PORT, timeout=self.timeout)
+            db.using_database(MILVUS_DATABASE, using=alias)
+            collection = Collection(MILVUS_COLLECTION, using=alias)
+        except Exception:
+            # Retried by the next face_collection() call after retry_interval
+            return
+
+        with self._lock:
+            if self.server_ip == server_ip:
+                self._milvus_alias = alias
+                self._collection = collection
+                return
+        # The server changed while connecting
+        connections.disconnect(alias)
+
+    def _close_milvus(self) -> None:
+        if self._milvus_alias is not None:
+            try:
+                connections.disconnect(self._milvus_alias)
+            except Exception:
+                pass
+        self._milvus_alias = None
+        self._collection = None
+
+    def _close(self) -> None:
+        self._close_milvus()
+        if self._mongo_client is not None:
+            self._mongo_client.close()
+            self._mongo_client = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+            self.server_ip = None
+
+
+db_manager = DatabaseManager()
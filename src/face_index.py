@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import time
+from collections import namedtuple
+from threading import Lock, Thread
+
+import numpy as np
+
+Hit = namedtuple("Hit", ["id", "distance"])
+
+
+def search_faces(collection, vectors, limit: int = 1) -> list:
+    """Search all `vectors` in one request, return (id, distance) of the nearest
+    enrolled face for each of them, (None, inf) when nothing was found.
+
+    `collection` is a pymilvus Collection or anything with the same `search`
+    signature, such as LocalCollection.
+    """
+    search_params = {
+        "metric_type": "L2",
+        "params": {"nprobe": 10},
+    }
+    results = collection.search(
+        np.asarray(vectors, np.float32).tolist(),
+        "face_vector",
+        search_params,
+        limit=limit,
+        output_fields=["face_id"],
+    )
+
+    matches = []
+    for hits in results:
+        if len(hits) == 0:
+            matches.append((None, float("inf")))
+        else:
+            matches.append((str(hits[0].id), hits[0].distance))
+    return matches
+
+
+class FaceIdentityIndex:
+    """In-memory copy of the enrolled face vectors for identity lookup.
+
+    Vectors are pulled from the Milvus collection and searched with one
+    matrix product, using the same squared L2 distance as the remote
+    search, so the nearest id is the one Milvus would return. A few thousand
+    faces take microseconds per query instead of a network round trip.
+    """
+
+    def __init__(self, vector_field: str = "face_vector", sync_interval: float = 300.0, page_size: int = 1000) -> None:
+        self.vector_field = vector_field
+        self.sync_interval = sync_interval
+        self.page_size = page_size
+
+        self._lock = Lock()
+        self._ids = np.empty(0, dtype=object)
+        self._vectors = np.empty((0, 0), np.float32)
+        self._sq_norms = np.empty(0, np.float32)
+
+        self.last_sync = 0.0
+        self._sync_thread = None
+
+    @property
+    def ready(self) -> bool:
+        return len(self._ids) > 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, ids, vectors) -> None:
+        """Replace the index content"""
+        vectors = np.asarray(vectors, np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(len(ids), -1)
+        ids = np.array([str(i) for i in ids], dtype=object)
+        sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+        with self._lock:
+            self._ids, self._vectors, self._sq_norms = ids, vectors, sq_norms
+
+    def search(self, queries, k: int = 1):
+        """Return (ids, distances) of the `k` nearest enrolled faces per query.
+
+        Both are (num_queries, k) arrays ordered from nearest, distances are
+        squared L2 like Milvus reports them.
+        """
+        queries = np.atleast_2d(np.asarray(queries, np.float32))
+        with self._lock:
+            ids, vectors, sq_norms = self._ids, self._vectors, self._sq_norms
+        if len(ids) == 0:
+            return np.empty((len(queries), 0), dtype=object), np.empty((len(queries), 0), np.float32)
+
+        k = min(k, len(ids))
+        dist = sq_norms[None, :] - 2.0 * queries @ vectors.T
+        dist += np.einsum("ij,ij->i", queries, queries)[:, None]
+        np.maximum(dist, 0.0, out=dist)
+
+        if k < len(ids):
+            top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(ids)), dist.shape)
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        return ids[top], np.take_along_axis(top_dist, order, axis=1)
+
+    def sync(self, collection) -> None:
+        """Reload every enrolled vector from the Milvus collection"""
+        pk = collection.schema.primary_field.name
+        ids, vectors = [], []
+        offset = 0
+        while True:
+            rows = collection.query(
+                expr=f"{pk} >= 0",
+                output_fields=[pk, self.vector_field],
+                offset=offset,
+                limit=self.page_size,
+            )
+            for row in rows:
+                ids.append(row[pk])
+                vectors.append(row[self.vector_field])
+            if len(rows) < self.page_size:
+                break
+            offset += self.page_size
+        if vectors:
+            self.build(ids, vectors)
+        self.last_sync = time.monotonic()
+
+    def maybe_sync(self, collection) -> None:
+        """Start a background sync if the last one is older than `sync_interval`"""
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+        if self.last_sync and time.monotonic() - self.last_sync < self.sync_interval:
+            return
+        self.last_sync = time.monotonic()
+        self._sync_thread = Thread(target=self._sync_quietly, args=(collection,), daemon=True)
+        self._sync_thread.start()
+
+    def _sync_quietly(self, collection) -> None:
+        try:
+            self.sync(collection)
+        except Exception:
+            # Keep serving the previous content, retried on the next interval
+            pass
+
+
+class LocalCollection:
+    """Stand-in for a pymilvus Collection answering `search` from an index.
+
+    Results are lists of hits with `id` and `distance`, like pymilvus, so
+    `search_faces` reads the index the same way it reads Milvus. The tests
+    check the local lookup against it.
+    """
+
+    def __init__(self, index: FaceIdentityIndex) -> None:
+        self.index = index
+
+    def search(self, data, anns_field, param, limit=10, output_fields=None, **kwargs):
+        ids, distances = self.index.search(data, k=limit)
+        return [
+            [Hit(int(i) if str(i).isdigit() else i, float(d)) for i, d in zip(row_ids, row_dist)]
+            for row_ids, row_dist in zip(ids, distances)
+        ]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from threading import Lock
+
+import numpy as np
+
+
+class FrameSlot:
+    """One preallocated slot of the ring buffer"""
+
+    def __init__(self, frame_shape: tuple) -> None:
+        self.frame = np.zeros(frame_shape, np.uint8)
+        self.seq = 0
+        self.data = None
+        self.readers = 0
+
+
+class FrameRingBuffer:
+    """Fixed-slot ring buffer shared by a camera Worker and its consumer.
+
+    The Worker copies every decoded frame straight into a preallocated slot
+    and the consumer reads the newest slot in place, so no frame goes through
+    a queued Qt signal. Only the latest frame matters: when the writer laps a
+    frame that was never read, that frame is counted as dropped. A slot that
+    is being read is pinned and skipped by the writer until it is released.
+    """
+
+    def __init__(self, num_slots: int = 3) -> None:
+        if num_slots < 2:
+            raise ValueError("Ring buffer needs at least 2 slots")
+        self.num_slots = num_slots
+        self._lock = Lock()
+        self._slots: list[FrameSlot] = []
+        self._write_idx = 0
+        self._latest_idx = -1
+        self._seq = 0
+        self._last_read_seq = 0
+
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+
+    def _ensure_slots(self, frame_shape: tuple) -> None:
+        if self._slots and self._slots[0].frame.shape == frame_shape:
+            return
+        # Resolution changed (or first frame): slots in use keep their arrays
+        # alive through the reader's references, so reallocating is safe.
+        self._slots = [FrameSlot(frame_shape) for _ in range(self.num_slots)]
+        self._write_idx = 0
+        self._latest_idx = -1
+
+    def begin_write(self, frame_shape: tuple) -> FrameSlot:
+        """Return a free slot for the writer to fill in place"""
+        with self._lock:
+            self._ensure_slots(tuple(frame_shape))
+            for _ in range(self.num_slots):
+                idx = self._write_idx
+                self._write_idx = (self._write_idx + 1) % self.num_slots
+                slot = self._slots[idx]
+                if idx != self._latest_idx and slot.readers == 0:
+                    return slot
+            # Every other slot is pinned by readers, grow by one slot
+            slot = FrameSlot(frame_shape)
+            self._slots.append(slot)
+            self.num_slots += 1
+            return slot
+
+    def commit_write(self, slot: FrameSlot, data: dict | None = None) -> int:
+        """Publish a filled slot as the latest frame, return its sequence number"""
+        with self._lock:
+            if self._latest_idx >= 0 and self._slots[self._latest_idx].seq > self._last_read_seq:
+                self.dropped += 1
+            self._seq += 1
+            slot.seq = self._seq
+            slot.data = data
+            try:
+                self._latest_idx = self._slots.index(slot)
+            except ValueError:
+                # Slots were reallocated while this one was being filled
+                return slot.seq
+            self.written += 1
+            return slot.seq
+
+    def acquire_latest(self, last_seq: int = 0) -> FrameSlot | None:
+        """Pin and return the newest slot if it is newer than `last_seq`.
+
+        The returned arrays are views into the buffer, call `release` once
+        done with them.
+        """
+        with self._lock:
+            if self._latest_idx < 0:
+                return None
+            slot = self._slots[self._latest_idx]
+            if slot.seq <= last_seq:
+                return None
+            slot.readers += 1
+            self._last_read_seq = slot.seq
+            self.read += 1
+            return slot
+
+    def release(self, slot: FrameSlot) -> None:
+        with self._lock:
+            slot.readers = max(0, slot.readers - 1)
+
+    def reset(self) -> None:
+        """Forget the latest frame, e.g. when the camera disconnects"""
+        with self._lock:
+            self._latest_idx = -1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "written": self.written,
+                "read": self.read,
+                "dropped": self.dropped,
+                "slots": self.num_slots,
+            }
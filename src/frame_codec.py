@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import struct
+
+import cv2
+import numpy as np
+
+# Encoder used for each model server endpoint. Endpoints that read pixel
+# values back out of the image (the timestamp row of LaneDetection) need a
+# lossless format.
+ENDPOINT_ENCODERS = {
+    "FaceDetection": ("jpeg", {"quality": 90}),
+    "FaceRecognition": ("jpeg", {"quality": 95}),
+    "FaceExpression": ("jpeg", {"quality": 95}),
+    "HumanPose": ("jpeg", {"quality": 90}),
+    "LaneDetection": ("png", {"compression": 1}),
+}
+DEFAULT_ENCODER = ("png", {"compression": 1})
+
+
+class FrameEncoder:
+    """Turn a uint8 image into the request body sent to the model server"""
+
+    name = ""
+    content_type = "application/octet-stream"
+
+    def encode(self, frame: np.ndarray, bgr: bool = True) -> bytes:
+        """Encode `frame`, whose channels are BGR (OpenCV) or RGB if `bgr` is False"""
+        raise NotImplementedError
+
+
+class RawEncoder(FrameEncoder):
+    """Uncompressed BGR pixels behind a 16 byte header (magic, height, width, channels)"""
+
+    name = "raw"
+    MAGIC = b"RAW0"
+    HEADER = struct.Struct(">4sIII")
+
+    def encode(self, frame: np.ndarray, bgr: bool = True) -> bytes:
+        if not bgr and frame.ndim == 3:
+            frame = frame[..., ::-1]
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+        return self.HEADER.pack(self.MAGIC, h, w, c) + frame.tobytes()
+
+    @classmethod
+    def decode(cls, payload: bytes) -> np.ndarray:
+        magic, h, w, c = cls.HEADER.unpack_from(payload)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a raw frame payload")
+        frame = np.frombuffer(payload, np.uint8, offset=cls.HEADER.size)
+        return frame.reshape((h, w, c) if c > 1 else (h, w))
+
+
+class JpegEncoder(FrameEncoder):
+    name = "jpeg"
+    content_type = "image/jpeg"
+
+    def __init__(self, quality: int = 90) -> None:
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+
+    def encode(self, frame: np.ndarray, bgr: bool = True) -> bytes:
+        if not bgr and frame.ndim == 3:
+            frame = frame[..., ::-1]
+        ok, buf = cv2.imencode(".jpg", frame, self.params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+
+class PngEncoder(FrameEncoder):
+    """Lossless PNG, compression 0-9. Level 1 is several times faster than
+    the zlib default used by PIL for a slightly bigger payload."""
+
+    name = "png"
+    content_type = "image/png"
+
+    def __init__(self, compression: int = 1) -> None:
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, int(compression)]
+
+    def encode(self, frame: np.ndarray, bgr: bool = True) -> bytes:
+        if not bgr and frame.ndim == 3:
+            frame = frame[..., ::-1]
+        ok, buf = cv2.imencode(".png", frame, self.params)
+        if not ok:
+            raise ValueError("PNG encoding failed")
+        return buf.tobytes()
+
+
+ENCODERS = {
+    RawEncoder.name: RawEncoder,
+    JpegEncoder.name: JpegEncoder,
+    PngEncoder.name: PngEncoder,
+}
+
+
+def get_encoder(name: str, **params) -> FrameEncoder:
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown frame encoder: {name}")
+    return ENCODERS[name](**params)
+
+
+def encoder_for(endpoint: str) -> FrameEncoder:
+    """Encoder configured for a model server endpoint in ENDPOINT_ENCODERS"""
+    name, params = ENDPOINT_ENCODERS.get(endpoint, DEFAULT_ENCODER)
+    return get_encoder(name, **params)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Per-endpoint limits: max requests in flight and (connect, read) timeout in seconds
+ENDPOINT_LIMITS = {
+    "FaceDetection": {"max_concurrency": 4, "timeout": (2.0, 5.0)},
+    "FaceRecognition": {"max_concurrency": 8, "timeout": (2.0, 3.0)},
+    "FaceExpression": {"max_concurrency": 8, "timeout": (2.0, 3.0)},
+    "HumanPose": {"max_concurrency": 2, "timeout": (2.0, 5.0)},
+    "ActionRecognition": {"max_concurrency": 2, "timeout": (2.0, 5.0)},
+}
+DEFAULT_LIMIT = {"max_concurrency": 4, "timeout": (2.0, 5.0)}
+
+
+class InferenceClient:
+    """Keep-alive HTTP client for the model server.
+
+    All requests go through one pooled `requests.Session`, so connections to
+    the server are reused instead of opened per call. Each endpoint has its
+    own semaphore and timeout, and `submit` runs a request on a shared
+    thread pool so independent calls can be in flight at the same time.
+    """
+
+    def __init__(self, limits: dict | None = None, pool_size: int = 16, max_workers: int = 16) -> None:
+        self.limits = dict(ENDPOINT_LIMITS if limits is None else limits)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+        self._semaphores = {}
+        self._semaphores_lock = Lock()
+
+    def _limit(self, endpoint: str) -> dict:
+        return self.limits.get(endpoint, DEFAULT_LIMIT)
+
+    def _semaphore(self, endpoint: str) -> BoundedSemaphore:
+        with self._semaphores_lock:
+            if endpoint not in self._semaphores:
+                self._semaphores[endpoint] = BoundedSemaphore(self._limit(endpoint)["max_concurrency"])
+            return self._semaphores[endpoint]
+
+    def post(self, endpoint: str, url: str, **kwargs) -> requests.Response | None:
+        """POST to `url`, return None when the server can't be reached in time"""
+        kwargs.setdefault("timeout", self._limit(endpoint)["timeout"])
+        with self._semaphore(endpoint):
+            try:
+                return self.session.post(url, **kwargs)
+            except requests.RequestException:
+                return None
+
+    def post_json(self, endpoint: str, url: str, **kwargs):
+        """POST and decode the JSON body, None on any failure"""
+        response = self.post(endpoint, url, **kwargs)
+        if response is None or response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def submit(self, endpoint: str, url: str, **kwargs) -> Future:
+        """Run `post_json` on the thread pool"""
+        return self.executor.submit(self.post_json, endpoint, url, **kwargs)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+        self.session.close()
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import abc
 
+import numpy as np
 from PyQt5 import QtCore, QtWidgets
 
 from src.camera_thread import CameraWidget, Worker
-from src.consumer_thread import Consumer
+from src.consumer_thread import InferenceScheduler
+from src.frame_buffer import FrameRingBuffer
 from ui.ui_mainwindow import Ui_MainWindow
 
 
@@ -104,28 +106,29 @@ class LiveStreamGrid(QtWidgets.QWidget):
         
         self.mutex2 = QtCore.QMutex()
         self.wait_condition2 = QtCore.QWaitCondition()
-        # self.consumer = Consumer(parent=self.p)
+        self.scheduler = None
         
 
     def setGridStyle(self, grid_style: GridStyle):
         self.grid_style = grid_style
 
     def initialize_grid(self, camera_datas):
+        if self.scheduler is None:
+            self.scheduler = InferenceScheduler(self.p, self.mutex2, self.wait_condition2)
+            self.scheduler.send_predicted_frame.connect(self.recv_predicted_frame)
+
         for data in camera_datas:
             if data["CAM NAME"] in self.cam_managers:
                 cameraWidget: CameraWidget = self.cam_managers[data["CAM NAME"]]["cameraWidget"]
-                consumer: Consumer = self.cam_managers[data["CAM NAME"]]["consumer"]
+                frame_buffer: FrameRingBuffer = self.cam_managers[data["CAM NAME"]]["buffer"]
                 if cameraWidget.isRunning():
                     cameraWidget.taskStop()
-                if consumer.isRunning():
-                    consumer.taskStop()
                 cameraWidget.worker.reinit_params(data)
             else:
-                worker = Worker(self, data=data, mutex=self.mutex,  wait_condition=self.wait_condition)
+                frame_buffer = FrameRingBuffer()
+                worker = Worker(self, data=data, buffer=frame_buffer, mutex=self.mutex,  wait_condition=self.wait_condition)
                 cameraWidget = CameraWidget(parent=self.p, data=data, worker=worker)
-                consumer = Consumer(self.p, self.mutex2, self.wait_condition2)
                 cameraWidget.send_camera_status.connect(self.recv_update_status_from_camera)
-                cameraWidget.worker.send_data_to_consumer.connect(consumer.update_data_to_buffer, type=QtCore.Qt.QueuedConnection)
                 # consumer.send_buffer_signal_state.connect(cameraWidget.worker.update_buffer_status)
                 cameraWidget.installEventFilter(self)
                 cameraWidget.setObjectName(cameraWidget.obj_name)
@@ -134,32 +137,38 @@ class LiveStreamGrid(QtWidgets.QWidget):
                 # self.ui.LiveStreamGrid.addWidget(cameraWidget, idx//3, idx%3)
                 self.grid_style.addWidget(cameraWidget, index=idx)
 
-                self.cam_managers[cameraWidget.obj_name] = {"cameraWidget": cameraWidget, "is_window_maximized": False, "consumer": consumer}
+                self.cam_managers[cameraWidget.obj_name] = {"cameraWidget": cameraWidget, "is_window_maximized": False, "buffer": frame_buffer}
 
+            self.scheduler.add_camera(data["CAM NAME"], frame_buffer)
             cameraWidget.start()
-            consumer.start()
-        # if not self.consumer.isRunning():
-        #     self.consumer.start()
+
+        if not self.scheduler.isRunning():
+            self.scheduler.start()
 
 
     @QtCore.pyqtSlot(str, bool)
     def recv_update_status_from_camera(self, cam_name: str, status: bool):
         self.send_camera_update_status.emit(cam_name, status)
 
+    @QtCore.pyqtSlot(str, np.ndarray)
+    def recv_predicted_frame(self, cam_name: str, frame: np.ndarray):
+        # The scheduler annotates the masked ROI crop, so the maximized view
+        # shows the ROI only, the grid keeps the full frame from the Worker
+        if cam_name in self.cam_managers and self.cam_managers[cam_name]["is_window_maximized"]:
+            self.cam_managers[cam_name]["cameraWidget"].update_frame(frame)
+
     def remove_camera(self, cam_name_lst: list[str]):
         """ receive a list of deleted camera name from setup table and remove those cameras"""  
         for cam_name in cam_name_lst:
             if cam_name not in self.cam_managers: continue
             cameraWidget: CameraWidget = self.cam_managers[cam_name]["cameraWidget"]
             cameraWidget.worker.send_frame.disconnect()
-            cameraWidget.worker.send_data_to_consumer.disconnect()
             cameraWidget.worker.send_update_status.disconnect()
             cameraWidget.send_camera_status.disconnect()
             cameraWidget.taskStop()
             
-            consumer: Consumer = self.cam_managers[cam_name]["consumer"]
-            consumer.taskStop()
-            consumer.deleteLater()
+            if self.scheduler is not None:
+                self.scheduler.remove_camera(cam_name)
 
             self.ui.LiveStreamGrid.removeWidget(cameraWidget)
             cameraWidget.deleteLater()
@@ -185,13 +194,13 @@ class LiveStreamGrid(QtWidgets.QWidget):
                                         show=False)
             self.cam_managers[obj_name_clicked]['is_window_maximized'] = True
             self.cam_managers[obj_name_clicked]["cameraWidget"].worker.pause = True
-            self.cam_managers[obj_name_clicked]["consumer"].send_predicted_frame.connect(self.cam_managers[obj_name_clicked]["cameraWidget"].update_frame)
+            self.scheduler.set_display_camera(obj_name_clicked, True)
         else:
             self.grid_style.filterWidget(cam_managers=self.cam_managers,
                                         ignore_obj_name=obj_name_clicked, 
                                         show=True)
             self.cam_managers[obj_name_clicked]['is_window_maximized'] = False
-            self.cam_managers[obj_name_clicked]["consumer"].send_predicted_frame.disconnect()
+            self.scheduler.set_display_camera(obj_name_clicked, False)
             self.cam_managers[obj_name_clicked]["cameraWidget"].worker.pause = False
 
         return True
@@ -205,8 +214,8 @@ class LiveStreamFunctions(LiveStreamGrid):
         for name, mng in self.cam_managers.items():
             if mng["cameraWidget"].isRunning():
                 mng["cameraWidget"].taskStop()
-            if mng["consumer"].isRunning():
-                mng["consumer"].taskStop()
+        if self.scheduler is not None and self.scheduler.isRunning():
+            self.scheduler.taskStop()
 
 
     def toggleCompactMode(self, state: bool):
@@ -217,6 +226,10 @@ class LiveStreamFunctions(LiveStreamGrid):
 
         self.reinit_grid()
         
+    def buffer_stats(self) -> dict:
+        """Frame buffer counters per camera, dropped frames show backpressure"""
+        return {name: mng["buffer"].stats() for name, mng in self.cam_managers.items()}
+
     def on_stopButtonClicked(self):
         try:
             for index, mng in enumerate(self.cam_managers.values()):
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-import datetime
+from collections import namedtuple
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QModelIndex, QObject, Qt
 from PyQt5.QtWidgets import QStyleOptionViewItem, QWidget
 
+from src.violation_pages import VIOLATION_COLUMNS, PageLoading, ViolationPager
+
+# Violations with their precomputed cells: `labels` holds the display text
+# of every cell (None for empty cells), `icons` the icon of every row
+ViolationRows = namedtuple("ViolationRows", ["frame", "labels", "icons"])
+
 
 class PandasModel(QtCore.QAbstractTableModel):
     def __init__(
@@ -360,11 +367,14 @@ class ViolationTableModel(QtCore.QAbstractTableModel):
             icons_mapping  # Dictionary mapping violation type to icon paths
         )
 
-        # Populate the "Loại vi phạm" column with icons
-        if "type" in self._df.columns:
-            self._df["type"] = self._df["type"].apply(
-                lambda x: self.icons_mapping.get(x, "")
-            )
+        # Icons are built once per model, rows only keep references to them
+        self.type_icons = {}
+        for violation_type, icon_path in self.icons_mapping.items():
+            icon = QtGui.QIcon()
+            icon.addPixmap(QtGui.QPixmap(icon_path), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+            self.type_icons[violation_type] = icon
+
+        self._rows = self._display_rows(self._df)
 
         self.rowsLoaded = ViolationTableModel.ROW_BATCH_COUNT
 
@@ -381,6 +391,43 @@ class ViolationTableModel(QtCore.QAbstractTableModel):
         """Get dataframe"""
         return self._df
 
+    def _display_rows(self, df: pd.DataFrame) -> ViolationRows:
+        """Precompute the text and icon of every cell of `df`"""
+        labels = np.empty(df.shape, dtype=object)
+        for col, name in enumerate(df.columns):
+            if name == "type":
+                # Only violation types with an icon are labelled
+                known = df[name].isin(self.icons_mapping).to_numpy()
+                labels[:, col] = np.where(known, df[name].to_numpy(dtype=object), None)
+            elif name == "path":
+                labels[:, col] = "Xem ảnh"
+            elif name == "time":
+                dt = pd.to_datetime(df[name], format="%Y-%m-%dT%H:%M:%S.%f", errors="coerce")
+                formatted = dt.dt.strftime("%d/%m/%Y %H:%M:%S").to_numpy(dtype=object)
+                labels[:, col] = np.where(dt.notna().to_numpy(), formatted, None)
+            else:
+                labels[:, col] = df[name].map(str).to_numpy(dtype=object)
+
+        icons = np.full(len(df), None, dtype=object)
+        if "type" in df.columns:
+            for violation_type, icon in self.type_icons.items():
+                icons[(df["type"] == violation_type).to_numpy()] = icon
+        return ViolationRows(df, labels, icons)
+
+    def _locate(self, row: int) -> tuple[ViolationRows, int]:
+        """Precomputed rows holding a source row, and the row's offset in them"""
+        return self._rows, row
+
+    def document_id(self, row: int) -> Any:
+        """`_id` of the violation shown in a source row"""
+        rows, offset = self._locate(row)
+        return rows.frame.index[offset]
+
+    def image_path(self, row: int) -> str:
+        """Image of the violation shown in a source row"""
+        rows, offset = self._locate(row)
+        return rows.frame["path"].iloc[offset]
+
     def update_data(self, row: int, col: int, value: Any) -> None:
         if not value and not isinstance(value, list):
             return
@@ -445,41 +492,25 @@ class ViolationTableModel(QtCore.QAbstractTableModel):
     def data(
         self, index: QtCore.QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
     ) -> QtCore.QVariant:
-        if role == Qt.ItemDataRole.DisplayRole:
-            if index.column() == 0:
-                violation_str = self._df.iloc[index.row(), index.column()]
-                if violation_str in self.icons_mapping.values():
-                    matching_key = next(
-                        key
-                        for key, value in self.icons_mapping.items()
-                        if value == violation_str
-                    )
-                    return QtCore.QVariant(matching_key)
-            elif (
-                index.column() == 3
-            ):  # Assuming the column index for "Thời gian vi phạm"
-                dt_str = self._df.iloc[index.row(), index.column()]
-                dt = datetime.datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%f")
-                formatted_datetime = dt.strftime("%d/%m/%Y %H:%M:%S")
-                return QtCore.QVariant(formatted_datetime)
-            elif index.column() == 1:  # Assuming the 2nd column is "Xem ảnh"
-                return QtCore.QVariant("Xem ảnh")
-            else:
-                return QtCore.QVariant(str(self._df.iloc[index.row(), index.column()]))
-        elif role == Qt.ItemDataRole.TextAlignmentRole:
+        if role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignCenter
-        elif role == Qt.ItemDataRole.DecorationRole:
-            if index.column() == 0:  # Assuming the column index for "Loại vi phạm"
-                icon_path = str(self._df.iloc[index.row(), index.column()])
-                if icon_path in self.icons_mapping.values():
-                    icon = QtGui.QIcon()
-                    icon.addPixmap(
-                        QtGui.QPixmap(
-                            icon_path), QtGui.QIcon.Normal, QtGui.QIcon.Off
-                    )
-                    return QtCore.QVariant(icon)
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.DecorationRole):
+            return QtCore.QVariant()
+        try:
+            rows, offset = self._locate(index.row())
+        except PageLoading:
+            # Shown until the page arrives, see ViolationCursorModel
+            return QtCore.QVariant("...") if role == Qt.ItemDataRole.DisplayRole else QtCore.QVariant()
+        except Exception:
+            return QtCore.QVariant()
 
-        return QtCore.QVariant()
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = rows.labels[offset, index.column()]
+        elif index.column() == 0:  # Assuming the column index for "Loại vi phạm"
+            value = rows.icons[offset]
+        else:
+            value = None
+        return QtCore.QVariant() if value is None else QtCore.QVariant(value)
 
     def setData(
         self,
@@ -490,6 +521,9 @@ class ViolationTableModel(QtCore.QAbstractTableModel):
         if role in [QtCore.Qt.EditRole, QtCore.Qt.DisplayRole]:
             if index.column() == 0:
                 self._df.iat[index.row(), index.column()] = value
+                row = self._display_rows(self._df.iloc[[index.row()]])
+                self._rows.labels[index.row()] = row.labels[0]
+                self._rows.icons[index.row()] = row.icons[0]
             self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole])
             return True
         return super().setData(index, value, role)
@@ -508,6 +542,122 @@ class ViolationTableModel(QtCore.QAbstractTableModel):
         return flag if not self.editable else flag | flag_edit
 
 
+class ViolationCursorModel(ViolationTableModel):
+    """Violation table that reads its rows from MongoDB page by page.
+
+    The row count is the size of the whole time range, counted on the
+    pager thread: the table is empty until `count_ready`, or `error` if the
+    count failed. Pages are also read on the pager thread, their rows show
+    a placeholder until the page arrives and `dataChanged` repaints them.
+    A failed page is reported once through `error` and retried by a later
+    paint after the pager's `retry_interval`. Only the pages cached by the
+    pager are held in memory.
+    """
+
+    count_ready = QtCore.pyqtSignal(int)
+    page_ready = QtCore.pyqtSignal(int)
+    page_failed = QtCore.pyqtSignal(int)
+    error = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        pager: ViolationPager,
+        editable: bool = False,
+        exclude_col: list[int] | None = None,
+        parent: Any | None = None,
+    ) -> None:
+        super().__init__(pd.DataFrame([], columns=VIOLATION_COLUMNS), editable, exclude_col, parent)
+        self.pager = pager
+        # Pages are turned into display rows once, by the thread loading them
+        self.pager.transform = self._display_rows
+        self.rowsLoaded = 0
+        # Pages requested by the view, until they arrive or fail
+        self._requested = set()
+        self._error_reported = False
+        # Queued even when a load finished before its callback was added,
+        # so the view is never changed from inside data()
+        self.count_ready.connect(self._set_row_count, QtCore.Qt.QueuedConnection)
+        self.page_ready.connect(self._page_ready, QtCore.Qt.QueuedConnection)
+        self.page_failed.connect(self._page_failed, QtCore.Qt.QueuedConnection)
+        self.pager.count_async().add_done_callback(self._count_done)
+
+    def _count_done(self, future) -> None:
+        # Runs on the pager thread, the signals queue the result to the view
+        if future.cancelled():
+            return
+        error = future.exception()
+        try:
+            if error is not None:
+                self.error.emit("Lỗi kết nối tới CSDL!")
+            else:
+                self.count_ready.emit(future.result())
+        except RuntimeError:
+            # The model was deleted, replaced by another query
+            pass
+
+    def _set_row_count(self, total: int) -> None:
+        self.beginResetModel()
+        self.rowsLoaded = total
+        self.endResetModel()
+
+    def _request(self, page: int) -> None:
+        if page in self._requested or page * self.pager.page_size >= self.rowsLoaded:
+            return
+        if self.pager.cached(page) is not None:
+            return
+        future = self.pager.request(page)
+        if future is None:
+            # Backing off after a failed load
+            return
+        self._requested.add(page)
+        future.add_done_callback(lambda future, page=page: self._page_done(page, future))
+
+    def _page_done(self, page: int, future) -> None:
+        # Runs on the pager thread
+        try:
+            if future.cancelled() or future.exception() is not None:
+                self.page_failed.emit(page)
+            else:
+                self.page_ready.emit(page)
+        except RuntimeError:
+            # The model was deleted, replaced by another query
+            pass
+
+    def _page_ready(self, page: int) -> None:
+        self._requested.discard(page)
+        self._error_reported = False
+        first = page * self.pager.page_size
+        last = min(first + self.pager.page_size, self.rowsLoaded) - 1
+        if first <= last:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
+
+    def _page_failed(self, page: int) -> None:
+        self._requested.discard(page)
+        if not self._error_reported:
+            self._error_reported = True
+            self.error.emit("Lỗi kết nối tới CSDL!")
+
+    def canFetchMore(self, index: QtCore.QModelIndex):
+        return False
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return self.rowsLoaded
+
+    def _locate(self, row: int) -> tuple[ViolationRows, int]:
+        """Cached rows of `row`, never waits for MongoDB.
+
+        Raises PageLoading and requests the page if it is not cached, the
+        next page is prefetched once a page is read.
+        """
+        page, offset = divmod(row, self.pager.page_size)
+        rows = self.pager.cached(page)
+        if rows is None:
+            self._request(page)
+            raise PageLoading("Dữ liệu đang được tải, vui lòng thử lại!")
+        self._request(page + 1)
+        return rows, offset
+
+
 class ViolationModel(ViolationTableModel):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
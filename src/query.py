@@ -122,6 +122,45 @@ def query_date_time(from_date: str, to_date: str):
     return pipeline
 
 
+def violation_summary(from_time: str, to_time: str):
+    """Chart summaries of the violations between two times, in one document:
+    counts per (date, type), per type and per (type, location)"""
+    pipeline = [
+        {
+            "$match": {
+                "time": {
+                    "$gte": from_time,
+                    "$lte": to_time
+                }
+            }
+        },
+        {
+            # Missing fields are grouped as "", like the pandas summary does
+            "$project": {
+                "_id": 0,
+                "type": {"$ifNull": ["$type", ""]},
+                "location": {"$ifNull": ["$location", ""]},
+                "date": {"$substrBytes": ["$time", 0, 10]}
+            }
+        },
+        {
+            "$facet": {
+                "by_day": [
+                    {"$group": {"_id": {"date": "$date", "type": "$type"}, "count": {"$sum": 1}}}
+                ],
+                "by_type": [
+                    {"$group": {"_id": "$type", "count": {"$sum": 1}}}
+                ],
+                "by_type_location": [
+                    {"$group": {"_id": {"type": "$type", "location": "$location"}, "count": {"$sum": 1}}}
+                ]
+            }
+        }
+    ]
+
+    return pipeline
+
+
 def get_test_data():
     document = [
         {
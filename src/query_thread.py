@@ -5,8 +5,10 @@ import numpy as np
 import pandas as pd
 import xarray as xr
 from PyQt5 import QtCore
+from pymongo import errors
 
-from src.query import query_date_time
+from src.query import query_date_time, violation_summary
+from src.violation_pages import documents_to_frame
 
 
 class QueryDateTimeThread(QtCore.QThread):
@@ -89,6 +91,18 @@ class QueryDateTimeThread(QtCore.QThread):
         return sorted_dataset
 
 class QueryViolationThread(QtCore.QThread):
+    """Summarize the violations between two datetimes for the charts.
+
+    The table pages through the same time range on its own (see
+    `ViolationPager`), this thread only builds the chart data. The counts
+    are computed by MongoDB with the `violation_summary` pipeline, if the
+    server rejects the aggregation the raw violations are loaded and
+    summarized in pandas (`run_pandas`). Connection errors are reported
+    at once.
+    """
+    # documents per round trip to MongoDB
+    CURSOR_BATCH_SIZE = 2000
+
     update_info = QtCore.pyqtSignal(str)
     send_query_data = QtCore.pyqtSignal(pd.DataFrame)
     send_data_to_charts = QtCore.pyqtSignal(pd.DataFrame, pd.Series, pd.Series, list)
@@ -111,67 +125,92 @@ class QueryViolationThread(QtCore.QThread):
     def run(self) -> None:
         with self._lock:
             try:
-                document = self.collection.find(
-                    {
-                        "time": {
-                            '$gte': self.from_datetime_str,
-                            "$lte": self.to_datetime_str
-                        }
-                    },
-                    {
-                        "type": 1,
-                        "location": 1,
-                        "path": 1,
-                        "speed": 1,
-                        "time": 1
-                    }
-                )
-            except Exception as error:
-                self.error.emit("Có lỗi xảy ra khi truy vấn dữ liệu!")
+                summary = next(self.collection.aggregate(
+                    violation_summary(self.from_datetime_str, self.to_datetime_str)
+                ))
+            except errors.ConnectionFailure:
+                # Includes server selection and network timeouts, the
+                # fallback would only wait for the same timeout again
+                self.error.emit("Lỗi kết nối tới CSDL!")
+                self.finished.emit()
                 return
-                        
-            df = self.check_query_error(document)
-            if df is not None:
-                self.send_query_data.emit(df)
-                self.update_info.emit("Spawn process...")
-                # pool = mp.Pool(processes=1)
-                self.update_info.emit("Process data...")
-                # result = pool.apply_async(process_data, (df,))
-                # total_in_day, type_occurrences, type_location_count = result.get()
-                total_in_day, type_occurrences, type_location_count = process_data(df.copy())
-                self.send_data_to_charts.emit(total_in_day, type_occurrences, type_location_count, self.date_range)
-                # pool.terminate()
-                # pool.join()
+            except errors.OperationFailure:
+                # No aggregation on this server (e.g. without $facet), the
+                # charts are computed in pandas from the raw violations
+                self.run_pandas()
+                return
+
+            charts = self.check_summary_error(summary)
+            if charts is not None:
+                self.send_data_to_charts.emit(*charts, self.date_range)
             else:
                 self.error.emit("Lỗi khi truy vấn dữ liệu!")
             self.finished.emit()
 
+    def run_pandas(self) -> None:
+        """Load the raw violations and summarize them with `process_data`. Documents
+        are streamed into one list per column, the DataFrame is built once at the end."""
+        try:
+            document = self.collection.find(
+                {
+                    "time": {
+                        '$gte': self.from_datetime_str,
+                        "$lte": self.to_datetime_str
+                    }
+                },
+                {
+                    "type": 1,
+                    "location": 1,
+                    "path": 1,
+                    "speed": 1,
+                    "time": 1
+                }
+            ).batch_size(self.CURSOR_BATCH_SIZE)
+        except Exception as error:
+            self.error.emit("Có lỗi xảy ra khi truy vấn dữ liệu!")
+            return
+
+        df = self.check_query_error(document)
+        if df is not None:
+            self.send_query_data.emit(df)
+            self.update_info.emit("Spawn process...")
+            # pool = mp.Pool(processes=1)
+            self.update_info.emit("Process data...")
+            # result = pool.apply_async(process_data, (df,))
+            # total_in_day, type_occurrences, type_location_count = result.get()
+            total_in_day, type_occurrences, type_location_count = process_data(df.copy())
+            self.send_data_to_charts.emit(total_in_day, type_occurrences, type_location_count, self.date_range)
+            # pool.terminate()
+            # pool.join()
+        else:
+            self.error.emit("Lỗi khi truy vấn dữ liệu!")
+        self.finished.emit()
+
+    def check_summary_error(self, summary: dict):
+        try:
+            if not summary["by_type"]:
+                # Only now tell an empty database from an empty time range
+                if self.collection.find_one({}, {"_id": 1}) is None:
+                    self.error.emit("Không có dữ liệu vi phạm trên CSDL!")
+                return
+            return process_summary(summary)
+        except Exception as error:
+            self.error.emit("Lỗi kết nối tới CSDL!")
+            return
+
     def check_query_error(self, document):
         try:
-            if self.collection.count_documents({}) == 0:
-                self.error.emit("Không có dữ liệu vi phạm trên CSDL!")
+            df = documents_to_frame(document)
+            if df.empty:
+                # Only now tell an empty database from an empty time range
+                if self.collection.find_one({}, {"_id": 1}) is None:
+                    self.error.emit("Không có dữ liệu vi phạm trên CSDL!")
                 return
-            else:
-                df = pd.DataFrame([])
-                for data in document:
-                    df = df._append(data, ignore_index=True)
-                try:
-                    if 'speed' in df.columns:
-                        # self.df = self.df.drop(['_id'], axis=1)
-                        new_cols = ['type', 'path', 'speed', 'time', 'location']
-                        df = df[new_cols]
-                    else:
-                        df['speed'] = ''
-                        new_cols = ['type', 'path', 'speed', 'time', 'location']
-                        df = df[new_cols]
-                except Exception:
-                    return
-                
             return df
         except Exception as error:
             self.error.emit("Lỗi kết nối tới CSDL!")
             return
-    
+
     def deleteAll(self):
         self.update_info.disconnect()
         self.send_data_to_charts.disconnect()
@@ -220,6 +259,31 @@ def process_data(df: pd.DataFrame):
     return total_in_day, type_occurrences, df_count
 
 
+def process_summary(summary: dict):
+    """Same charts as `process_data`, from the result of `violation_summary`"""
+    by_day = pd.DataFrame([dict(row["_id"], count=row["count"]) for row in summary["by_day"]])
+    by_day["Date"] = pd.to_datetime(by_day["date"], format="%Y-%m-%d").dt.date
+    total_in_day = by_day.set_index(["Date", "type"])["count"].unstack(fill_value=0).astype(float)
+
+    # Largest first, ties by name
+    by_type = sorted(summary["by_type"], key=lambda row: (-row["count"], row["_id"]))
+    type_occurrences = pd.Series(
+        [row["count"] for row in by_type],
+        index=pd.Index([row["_id"] for row in by_type], name="type"),
+        name="count",
+    )
+
+    df_count = pd.Series(
+        [row["count"] for row in summary["by_type_location"]],
+        index=pd.MultiIndex.from_tuples(
+            [(row["_id"]["type"], row["_id"]["location"]) for row in summary["by_type_location"]],
+            names=["type", "location"],
+        ),
+    ).sort_index()
+
+    return total_in_day, type_occurrences, df_count
+
+
 def create_date_range(start_date_str, end_date_str):
     # Convert the start and end date strings to pandas Timestamp objects
     start_date = pd.to_datetime(start_date_str, format="%Y-%m-%d %H:%M")
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+
+class ROIMask:
+    """ROI polygon of one camera with its mask and bounding rectangle.
+
+    The mask only depends on the normalized COORD and the frame resolution,
+    so it is built once and reused until either of them changes.
+    """
+
+    def __init__(self, coord: list) -> None:
+        self.set_coord(coord)
+
+    def set_coord(self, coord: list) -> None:
+        """Replace the normalized polygon, invalidates the cached mask"""
+        self.coord = np.asarray(coord, dtype=np.float64).reshape(-1, 2)
+        self._shape = None
+        self.pts = None
+        self.rect = None
+        self.mask = None
+
+    def get(self, shape: tuple):
+        """Return (pts, rect, mask) for a frame of the given shape.
+
+        pts is the polygon in pixels with shape (N, 1, 2), rect is
+        (x0, y0, x1, y1) clipped to the frame and mask is a 3-channel
+        0/255 image of the rect size, or None if there is no polygon.
+        """
+        h, w = shape[:2]
+        if self._shape != (h, w):
+            self._build(h, w)
+        return self.pts, self.rect, self.mask
+
+    def _build(self, h: int, w: int) -> None:
+        self._shape = (h, w)
+        if len(self.coord) < 3:
+            self.pts = np.empty((0, 1, 2), np.int32)
+            self.rect = (0, 0, w, h)
+            self.mask = None
+            return
+
+        self.pts = (self.coord * np.array([w, h])).astype(np.int32).reshape((-1, 1, 2))
+        x, y, bw, bh = cv2.boundingRect(self.pts)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + bw, w), min(y + bh, h)
+        self.rect = (x0, y0, x1, y1)
+
+        self.mask = np.zeros((y1 - y0, x1 - x0, 3), np.uint8)
+        cv2.fillPoly(self.mask, [self.pts - np.array([x0, y0], np.int32)], (255, 255, 255))
+
+    def crop_shape(self, shape: tuple) -> tuple:
+        x0, y0, x1, y1 = self.get(shape)[1]
+        return (y1 - y0, x1 - x0) + tuple(shape[2:])
+
+    def apply(self, img: np.ndarray, dst: np.ndarray | None = None) -> np.ndarray:
+        """Write the masked ROI crop of `img` into `dst`"""
+        _, (x0, y0, x1, y1), mask = self.get(img.shape)
+        crop = img[y0:y1, x0:x1]
+        if dst is None:
+            dst = np.empty_like(crop)
+        if mask is None:
+            np.copyto(dst, crop)
+        else:
+            cv2.bitwise_and(crop, mask, dst=dst)
+        return dst
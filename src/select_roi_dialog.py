@@ -35,6 +35,7 @@ class SelectROIDialog(QtWidgets.QDialog):
         self.ui.tableView.selectionModel().selectionChanged.connect(self.on_RowSelected)
         self.ui.tableView.setColumnHidden(2, True)
         self.ui.tableView.setColumnHidden(4, True)
+        self.ui.tableView.setColumnHidden(5, True)
                 
         self.ui.btnFinish.clicked.connect(self.on_FinishClick)
         self.ui.btnNext.clicked.connect(self.on_NextClick)
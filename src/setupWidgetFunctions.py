@@ -11,6 +11,9 @@ from src.pandasmodel import (SettingTableDelegate, SettingTableModel,
 from src.select_roi_dialog import SelectROIDialog
 from ui.ui_mainwindow import Ui_MainWindow
 
+# Analysis frame rate used when a camera has no FPS value in the setup table
+DEFAULT_FPS = 20
+
 
 def pd_to_list(df) -> list:
     results = list()
@@ -29,6 +32,7 @@ def pd_to_list(df) -> list:
                 "ZONE": row["ZONE"],
                 "COORD": row["COORD"],
                 "STATUS": row["STATUS"],
+                "FPS": row.get("FPS", DEFAULT_FPS),
                 "CAM_NUMBER": camera_stream,
             }
         )
@@ -67,12 +71,12 @@ class SetupTable(QtWidgets.QWidget):
         self.p = parent
 
         self.new_row = pd.DataFrame(
-            [[np.nan, np.nan, np.nan, [], "Offline"]],
-            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS"],
+            [[np.nan, np.nan, np.nan, [], "Offline", DEFAULT_FPS]],
+            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"],
         )
 
         self.df = pd.DataFrame(
-            [], columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS"]
+            [], columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"]
         )
         self.df["COORD"] = self.df["COORD"].astype("object")
 
@@ -104,8 +108,8 @@ class SetupTable(QtWidgets.QWidget):
         existing_cam_names = self.setupModel.dataframe["CAM NAME"].tolist()
         new_cam_name = self.generate_unique_cam_name(existing_cam_names, additional_cam_names)
         self.new_row = pd.DataFrame(
-            [[new_cam_name, np.nan, np.nan, [], "Offline"]],
-            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS"],
+            [[new_cam_name, np.nan, np.nan, [], "Offline", DEFAULT_FPS]],
+            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"],
         )
         self.setupModel.insertRows(index, count=1, init_data=self.new_row)
 
@@ -113,8 +117,8 @@ class SetupTable(QtWidgets.QWidget):
         existing_cam_names = self.setupModel.dataframe["CAM NAME"].tolist()
         new_cam_name = self.generate_unique_cam_name(existing_cam_names, additional_cam_names)
         self.new_row = pd.DataFrame(
-            [[new_cam_name, np.nan, np.nan, [], "Offline"]],
-            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS"],
+            [[new_cam_name, np.nan, np.nan, [], "Offline", DEFAULT_FPS]],
+            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"],
         )
         self.setupModel.insertRows(index + 1, count=1, init_data=self.new_row)
 
@@ -263,8 +267,8 @@ class SetupWidgetFunction(SetupTable):
         existing_cam_names = self.setupModel.dataframe["CAM NAME"].tolist()
         new_cam_name = self.generate_unique_cam_name(existing_cam_names)
         self.new_row = pd.DataFrame(
-            [[new_cam_name, np.nan, np.nan, [], "Offline"]],
-            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS"],
+            [[new_cam_name, np.nan, np.nan, [], "Offline", DEFAULT_FPS]],
+            columns=["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"],
         )
         self.insert_data(self.setupModel.rowCount())
 
@@ -319,6 +323,11 @@ class SetupWidgetFunction(SetupTable):
 
         if "STATUS" not in self.df.columns:
             self.df["STATUS"] = "Offline"
+        if "FPS" not in self.df.columns:
+            self.df["FPS"] = DEFAULT_FPS
+        # SetupTableModel addresses COORD/STATUS by position
+        ordered_cols = ["CAM NAME", "IP", "ZONE", "COORD", "STATUS", "FPS"]
+        self.df = self.df[ordered_cols + [c for c in self.df.columns if c not in ordered_cols]]
         self.df["COORD"] = self.df["COORD"].astype("object")
 
         null_mask = self.df["COORD"].isnull()
@@ -7,8 +7,9 @@ import pandas as pd
 from PyQt5 import QtCore, QtWidgets
 
 from src.displayImage import DisplayImage
-from src.pandasmodel import ViolationTableModel
+from src.pandasmodel import ViolationCursorModel, ViolationTableModel
 from src.query_thread import QueryViolationThread
+from src.violation_pages import VIOLATION_COLUMNS, ViolationPager, search_filter
 from ui.ui_mainwindow import Ui_MainWindow
 
 basedir = os.getcwd()
@@ -179,12 +180,30 @@ class ViolationFunction(ViolationFilterBar):
 
         self.ui.violationTableView.clicked.connect(self.display)
 
+        # (from, to) of the last filter, the table is queried again on search
+        self.time_range = None
+        self.search_column = 0
+        # The table is searched in MongoDB once typing pauses
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.load_violation_table)
+
     def filterColumnSearch(self, idx):
-        self.sort_proxy_model.setFilterKeyColumn(idx)
+        self.search_column = idx
+        if self.time_range is not None:
+            if self.ui.tableSearch_Vio.text():
+                self.search_timer.start()
+        else:
+            self.sort_proxy_model.setFilterKeyColumn(idx)
 
     def update_search(self, text):
         """Connected to tableSearch bar (QLineEdit)"""
-        self.sort_proxy_model.setFilterWildcard(f"*{text}*")
+        if self.time_range is not None:
+            # Filtering in the proxy would read every row of the time range
+            self.search_timer.start()
+        else:
+            self.sort_proxy_model.setFilterWildcard(f"*{text}*")
 
     def get_columns(self):
         col = self.violationModel.dataframe.columns
@@ -193,13 +212,20 @@ class ViolationFunction(ViolationFilterBar):
     def on_FilterClicked(self):
         from_datetime, to_datetime = self.collect_filter_datetime()
         
+        # The table reads its rows page by page, the thread only loads the charts
+        self.time_range = (
+            from_datetime.isoformat(timespec='milliseconds'),
+            to_datetime.isoformat(timespec='milliseconds'),
+        )
+        self.load_violation_table()
+
         query = QueryViolationThread(
             collection=self.collection,
             from_datetime=from_datetime,
             to_datetime=to_datetime,
             parent=self.p
         )
-        
+
         query.send_query_data.connect(self.recv_query_data)
         query.send_data_to_charts.connect(self.recv_data_charts)
         # query.send_process_update.connect(lambda x: print("Process update status: ", x))
@@ -228,6 +254,18 @@ class ViolationFunction(ViolationFilterBar):
         self.ui.btnFilterVio.setEnabled(True)
         self.ui.labelLoading.setVisible(False)
 
+    @QtCore.pyqtSlot(str)
+    def on_errorTable(self, error: str):
+        if self.sender() is not self.violationModel:
+            # A table replaced by a later search or filter
+            return
+        if self.violationModel.rowCount() == 0:
+            # The count failed, a failed page keeps the rows already read
+            self.set_violation_model(ViolationTableModel(pd.DataFrame([], columns=VIOLATION_COLUMNS), editable=False))
+        if self.ui.btnFilterVio.isEnabled():
+            # Otherwise the chart query reports it for the same time range
+            QtWidgets.QMessageBox.critical(self.p, "ERROR", f"{error}")
+
     @QtCore.pyqtSlot(str)
     def on_errorQuery(self, error: str):
         QtWidgets.QMessageBox.critical(self.p, "ERROR", f"{error}")
@@ -347,21 +385,39 @@ class ViolationFunction(ViolationFilterBar):
 
     @QtCore.pyqtSlot(pd.DataFrame)
     def recv_query_data(self, data: pd.DataFrame):
+        # The table pages through the time range on its own
         self.df = data
-        self.violationModel = ViolationTableModel(self.df.copy(), editable=False)
+
+    def load_violation_table(self):
+        """Show the violations of the last filter that match the search bar"""
+        self.search_timer.stop()
+        if self.time_range is None:
+            return
+        column = VIOLATION_COLUMNS[self.search_column] if 0 <= self.search_column < len(VIOLATION_COLUMNS) else None
+        search = search_filter(column, self.ui.tableSearch_Vio.text()) if column else None
+        model = ViolationCursorModel(ViolationPager(self.collection, *self.time_range, search=search), editable=False)
+        model.error.connect(self.on_errorTable)
+        self.set_violation_model(model)
+
+    def set_violation_model(self, model: ViolationTableModel):
+        if isinstance(self.violationModel, ViolationCursorModel):
+            self.violationModel.pager.close()
+        self.violationModel = model
+        if isinstance(model, ViolationCursorModel):
+            # The search runs in MongoDB and rows keep the default height, a
+            # proxy filter or rows sized to their contents would read every page
+            self.sort_proxy_model.setFilterWildcard("")
+            self.ui.violationTableView.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        else:
+            self.ui.violationTableView.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
         self.sort_proxy_model.setSourceModel(self.violationModel)
         self.ui.violationTableView.setModel(self.sort_proxy_model)
         self.violationDelegate = AlignDelegate(self.ui.violationTableView)
         self.ui.violationTableView.setItemDelegate(self.violationDelegate)
 
         self.ui.violationTableView.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
-        self.ui.violationTableView.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
         self.ui.violationTableView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        
-        # Call showDocument for each row of the DataFrame
-        # for i, data in self.df.iterrows():
-        #     self.showDocument(i, data)
-        
+
     def showDocument(self, i, data):
         icon_path = ""
 
@@ -384,22 +440,10 @@ class ViolationFunction(ViolationFilterBar):
     def display(self, item):
         if item.column() == 1:
             try:
-                selected_index = self.ui.violationTableView.currentIndex()
-                row = selected_index.row()
-
-                from_time, to_time = self.collect_filter_datetime()
-                from_time_str = from_time.isoformat(timespec='milliseconds')
-                to_time_str = to_time.isoformat(timespec='milliseconds')
-                
-                data = self.collection.find(
-                    {'time': 
-                        {
-                            '$gte': from_time_str,
-                            '$lte': to_time_str
-                        }
-                    })[row]
-
-                pathImage = data["path"]
+                # The view shows the proxy, the row is read from the model's
+                # loaded rows instead of querying the database again
+                row = self.sort_proxy_model.mapToSource(item).row()
+                pathImage = self.violationModel.image_path(row)
                 self.displayImage.display_image(pathImage)
                 self.displayImage.show()
             except Exception as error:
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable
+
+import pandas as pd
+
+VIOLATION_COLUMNS = ['type', 'path', 'speed', 'time', 'location']
+
+# Rows are ordered on (time, _id), the _id breaks ties between equal times
+SORT_KEY = [("time", 1), ("_id", 1)]
+
+
+def time_range_filter(from_time: str, to_time: str) -> dict:
+    return {"time": {"$gte": from_time, "$lte": to_time}}
+
+
+def search_filter(column: str, text: str) -> dict | None:
+    """Documents whose `column` contains `text`, None for an empty search.
+
+    Matches the stored values, times in their ISO form. Speeds are numbers
+    and are matched on their decimal string ($regexMatch, MongoDB 4.2+).
+    """
+    if not text:
+        return None
+    if column == "speed":
+        return {"$expr": {"$regexMatch": {"input": {"$toString": f"${column}"}, "regex": re.escape(text)}}}
+    return {column: {"$regex": re.escape(text)}}
+
+
+class PageLoading(LookupError):
+    """The page of a row is still being read by the pager thread"""
+
+
+def documents_to_frame(documents: list) -> pd.DataFrame:
+    """DataFrame of the violation columns, indexed by the document `_id`"""
+    columns = {col: [] for col in VIOLATION_COLUMNS}
+    ids = []
+    for data in documents:
+        ids.append(data.get("_id"))
+        for col in VIOLATION_COLUMNS:
+            # Only some violations have a speed
+            columns[col].append(data.get(col, ''))
+    return pd.DataFrame(columns, index=ids, columns=VIOLATION_COLUMNS)
+
+
+class ViolationPager:
+    """Random access to the violations of a time range, one page at a time.
+
+    Pages are read with keyset pagination on (time, _id): page k starts
+    after the last key of page k - 1, so reading a page never skips over
+    the documents before it. The start keys of pages that were never read
+    are looked up with a keys-only query. Only the last `cache_pages`
+    pages are kept in memory and the page after the one just read is
+    prefetched on a background thread. `page` and `locate` wait for the
+    rows, `request` and `cached` never block: a failed background load is
+    not retried for `retry_interval` seconds.
+
+    Rows are read in (time, _id) order, the collection needs an index on
+    those keys (see README) for pages past the first ones to stay fast.
+    """
+
+    PROJECTION = {col: 1 for col in VIOLATION_COLUMNS}
+
+    def __init__(
+        self,
+        collection,
+        from_time: str,
+        to_time: str,
+        search: dict | None = None,
+        page_size: int = 200,
+        cache_pages: int = 8,
+        transform: Callable[[pd.DataFrame], Any] | None = None,
+        retry_interval: float = 5.0,
+    ) -> None:
+        self.collection = collection
+        self.filter = time_range_filter(from_time, to_time)
+        if search is not None:
+            self.filter = {"$and": [self.filter, search]}
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        # Applied once to every page when it is loaded, pages are the
+        # transformed values from then on
+        self.transform = transform
+        self.retry_interval = retry_interval
+
+        self.total = None
+        # page -> (time, _id) of the last row before it, None for the first page
+        self._after = {0: None}
+        self._pages: OrderedDict[int, Any] = OrderedDict()
+        self._pending: dict[int, Future] = {}
+        # page -> time.monotonic() of its last failed load
+        self._failed: dict[int, float] = {}
+        self._lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="violation-pages")
+
+    def count(self) -> int:
+        """Number of violations in the time range matching the search, queried once"""
+        if self.total is None:
+            self.total = self.collection.count_documents(self.filter)
+        return self.total
+
+    def count_async(self) -> Future:
+        """`count` on the pager thread, ahead of any page load"""
+        return self.executor.submit(self.count)
+
+    @property
+    def page_count(self) -> int:
+        return -(-self.count() // self.page_size)
+
+    def _keyset_filter(self, after: tuple | None) -> dict:
+        if after is None:
+            return self.filter
+        time, _id = after
+        return {
+            "$and": [
+                self.filter,
+                {"$or": [{"time": {"$gt": time}}, {"time": time, "_id": {"$gt": _id}}]},
+            ]
+        }
+
+    def _start_key(self, page: int) -> tuple | None:
+        """(time, _id) of the row before `page`, from the nearest known page"""
+        with self._lock:
+            if page in self._after:
+                return self._after[page]
+            known = max(k for k in self._after if k < page)
+            after = self._after[known]
+        last = list(
+            self.collection.find(self._keyset_filter(after), {"time": 1})
+            .sort(SORT_KEY)
+            .skip((page - known) * self.page_size - 1)
+            .limit(1)
+        )
+        if not last:
+            raise IndexError(f"page {page} is past the end of the time range")
+        key = (last[0]["time"], last[0]["_id"])
+        with self._lock:
+            self._after[page] = key
+        return key
+
+    def _load(self, page: int):
+        try:
+            documents = list(
+                self.collection.find(self._keyset_filter(self._start_key(page)), self.PROJECTION)
+                .sort(SORT_KEY)
+                .limit(self.page_size)
+            )
+            df = documents_to_frame(documents)
+            if self.transform is not None:
+                df = self.transform(df)
+            with self._lock:
+                if documents:
+                    self._after[page + 1] = (documents[-1]["time"], documents[-1]["_id"])
+                self._pages[page] = df
+                self._failed.pop(page, None)
+                while len(self._pages) > self.cache_pages:
+                    self._pages.popitem(last=False)
+            return df
+        except Exception:
+            with self._lock:
+                self._failed[page] = time.monotonic()
+            raise
+        finally:
+            # A failed load is retried by the next access
+            with self._lock:
+                self._pending.pop(page, None)
+
+    def request(self, page: int) -> Future | None:
+        """Load `page` on the pager thread unless it is cached or already loading.
+
+        Returns the future of the rows, None while a failed load of the
+        page waits for `retry_interval` or after `close`.
+        """
+        with self._lock:
+            if page in self._pages:
+                future = Future()
+                future.set_result(self._pages[page])
+                return future
+            if page in self._pending:
+                return self._pending[page]
+            failed = self._failed.get(page)
+            if failed is not None and time.monotonic() - failed < self.retry_interval:
+                return None
+            try:
+                future = self._pending[page] = self.executor.submit(self._load, page)
+            except RuntimeError:
+                # Closed, the table using this pager was replaced
+                return None
+            return future
+
+    def cached(self, page: int):
+        """Rows of `page` if they are cached, None otherwise"""
+        with self._lock:
+            df = self._pages.get(page)
+            if df is not None:
+                self._pages.move_to_end(page)
+            return df
+
+    def _prefetch(self, page: int) -> None:
+        """Start loading `page` in the background unless it is cached or already loading"""
+        self.request(page)
+
+    def page(self, page: int):
+        """Rows of `page`, loaded or waited for if not cached, prefetches the next one"""
+        future = None
+        with self._lock:
+            df = self._pages.get(page)
+            if df is not None:
+                self._pages.move_to_end(page)
+            elif page in self._pending:
+                future = self._pending[page]
+            else:
+                # Loaded here rather than queued behind a prefetch, registered
+                # so that neither a prefetch nor another caller loads it again
+                self._pending[page] = loading = Future()
+        if df is None and future is not None:
+            df = future.result()
+        elif df is None:
+            try:
+                df = self._load(page)
+            except BaseException as error:
+                loading.set_exception(error)
+                raise
+            loading.set_result(df)
+        if page + 1 < self.page_count:
+            self._prefetch(page + 1)
+        return df
+
+    def locate(self, row: int) -> tuple:
+        """Page holding a row of the time range, and the row's offset in it"""
+        page, offset = divmod(row, self.page_size)
+        return self.page(page), offset
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
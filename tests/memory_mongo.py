@@ -0,0 +1,147 @@
+"""In-memory stand-ins for the pymongo calls of the violation page.
+
+Shared by the tests and benchmark.py, they implement only the queries,
+stages and operators the GUI sends.
+"""
+from __future__ import annotations
+
+import datetime
+import re
+
+import numpy as np
+
+
+def _matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$expr":
+            if not _evaluate(condition, document):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, q) for q in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(key)
+            ops = {"$gt": value.__gt__, "$gte": value.__ge__, "$lt": value.__lt__, "$lte": value.__le__,
+                   "$regex": lambda pattern: isinstance(value, str) and re.search(pattern, value) is not None}
+            if value is None or not all(ops[op](bound) for op, bound in condition.items()):
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+class MemoryCursor:
+    def __init__(self, documents: list, projection: dict | None) -> None:
+        self.documents = documents
+        self.projection = projection
+        self._skip, self._limit = 0, 0
+
+    def sort(self, keys):
+        for key, direction in reversed(keys):
+            self.documents.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def batch_size(self, n: int):
+        return self
+
+    def __iter__(self):
+        documents = self.documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        for document in documents:
+            if self.projection:
+                document = {k: v for k, v in document.items() if k == "_id" or k in self.projection}
+            yield document
+
+
+class MemoryCollection:
+    """In-memory stand-in for the pymongo collection calls of the violation page"""
+
+    def __init__(self, documents: list) -> None:
+        self.documents = documents
+        self.queries = 0
+
+    def find(self, query: dict | None = None, projection: dict | None = None) -> MemoryCursor:
+        self.queries += 1
+        return MemoryCursor([d for d in self.documents if _matches(d, query or {})], projection)
+
+    def find_one(self, query: dict | None = None, projection: dict | None = None):
+        return next(iter(self.find(query, projection).limit(1)), None)
+
+    def count_documents(self, query: dict) -> int:
+        self.queries += 1
+        return sum(_matches(d, query) for d in self.documents)
+
+    def aggregate(self, pipeline: list):
+        """The stages and operators used by src.query.violation_summary"""
+        return iter(_run_pipeline(list(self.documents), pipeline))
+
+
+def _evaluate(expression, document: dict):
+    if isinstance(expression, str) and expression.startswith("$"):
+        return document.get(expression[1:])
+    if isinstance(expression, dict):
+        if "$ifNull" in expression:
+            value, default = expression["$ifNull"]
+            value = _evaluate(value, document)
+            return _evaluate(default, document) if value is None else value
+        if "$toString" in expression:
+            value = _evaluate(expression["$toString"], document)
+            return None if value is None else str(value)
+        if "$regexMatch" in expression:
+            value = _evaluate(expression["$regexMatch"]["input"], document)
+            return isinstance(value, str) and re.search(expression["$regexMatch"]["regex"], value) is not None
+        if "$substrBytes" in expression:
+            value, start, length = expression["$substrBytes"]
+            value = _evaluate(value, document)
+            return "" if value is None else value[start:start + length]
+        return {key: _evaluate(value, document) for key, value in expression.items()}
+    return expression
+
+
+def _run_pipeline(documents: list, pipeline: list) -> list:
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$match":
+            documents = [d for d in documents if _matches(d, spec)]
+        elif op == "$project":
+            documents = [{key: _evaluate(value, d) for key, value in spec.items() if value != 0} for d in documents]
+        elif op == "$facet":
+            documents = [{name: _run_pipeline(documents, stages) for name, stages in spec.items()}]
+        elif op == "$group":
+            groups = {}
+            for d in documents:
+                key = _evaluate(spec["_id"], d)
+                group = groups.setdefault(repr(key), {"_id": key, **{name: 0 for name in spec if name != "_id"}})
+                for name, accumulator in spec.items():
+                    if name != "_id":
+                        group[name] += _evaluate(accumulator["$sum"], d)
+            documents = list(groups.values())
+        else:
+            raise NotImplementedError(op)
+    return documents
+
+
+def violation_documents(n: int, rng) -> list:
+    """Violations of one month, several per second so times repeat"""
+    types = ["Quá tốc độ", "Ngược chiều", "Dừng đỗ xe", "Người đi bộ", "Vật thể lạ"]
+    seconds = np.sort(rng.integers(0, 31 * 24 * 3600, n // 3 + 1))[rng.integers(0, n // 3 + 1, n)]
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        {"_id": i, "type": types[int(rng.integers(len(types)))], "path": f"/images/{i}.jpg",
+         "speed": int(rng.integers(40, 120)),
+         "time": (start + datetime.timedelta(seconds=int(t))).isoformat(timespec="milliseconds"),
+         "location": f"CAM{int(rng.integers(8)):02d}"}
+        for i, t in enumerate(seconds)
+    ]
@@ -0,0 +1,79 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from deep_sort import preprocessing
+
+
+def candidates(n=300, seed=0):
+    """Jittered boxes (x1, y1, x2, y2) around a few objects, with scores and classes"""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 1000, size=(n // 10, 2))
+    owner = rng.integers(0, len(centers), size=n)
+    wh = rng.uniform(20, 120, size=(n, 2))
+    xy = centers[owner] + rng.normal(scale=8, size=(n, 2)) - wh / 2
+    return np.c_[xy, xy + wh], rng.random(n), owner % 3
+
+
+@pytest.fixture
+def without_torchvision(monkeypatch):
+    """preprocessing imported as if torchvision were not installed"""
+    pytest.importorskip("torch")
+    monkeypatch.setitem(sys.modules, "torchvision", None)
+    module = importlib.reload(preprocessing)
+    yield module
+    monkeypatch.undo()
+    importlib.reload(preprocessing)
+
+
+def test_numpy_input_gives_indices():
+    boxes, scores, classes = candidates()
+    keep = preprocessing.batched_nms(boxes, scores, 0.45, classes)
+    assert isinstance(keep, np.ndarray)
+    assert np.all(np.diff(scores[keep]) <= 0)
+
+
+def test_torch_without_torchvision(without_torchvision):
+    import torch
+
+    assert without_torchvision.torch is torch
+    assert without_torchvision.torchvision is None
+
+    boxes, scores, classes = candidates()
+    expected = without_torchvision.batched_nms(boxes, scores, 0.45, classes)
+    keep = without_torchvision.batched_nms(
+        torch.tensor(boxes, requires_grad=True), torch.tensor(scores), 0.45, torch.tensor(classes))
+    assert isinstance(keep, torch.Tensor) and keep.device == torch.device("cpu")
+    assert keep.tolist() == expected.tolist()
+
+    # Scores and classes given as plain arrays next to a tensor of boxes
+    keep = without_torchvision.batched_nms(torch.tensor(boxes), scores, 0.45, list(classes))
+    assert keep.tolist() == expected.tolist()
+
+
+def test_cuda_tensor_without_torchvision(without_torchvision):
+    import torch
+
+    if not torch.cuda.is_available():
+        pytest.skip("no CUDA device")
+    boxes, scores, classes = candidates()
+    expected = without_torchvision.batched_nms(boxes, scores, 0.45, classes)
+    device = torch.device("cuda")
+    keep = without_torchvision.batched_nms(
+        torch.tensor(boxes, device=device), torch.tensor(scores, device=device), 0.45,
+        torch.tensor(classes, device=device))
+    assert keep.device.type == "cuda"
+    assert keep.cpu().tolist() == expected.tolist()
+
+
+def test_same_as_torchvision():
+    torch = pytest.importorskip("torch")
+    torchvision = pytest.importorskip("torchvision")
+    boxes, scores, classes = candidates()
+    expected = torchvision.ops.batched_nms(
+        torch.from_numpy(boxes), torch.from_numpy(scores), torch.from_numpy(classes), 0.45)
+    assert preprocessing.batched_nms(boxes, scores, 0.45, classes).tolist() == expected.tolist()
+    expected = torchvision.ops.nms(torch.from_numpy(boxes), torch.from_numpy(scores), 0.45)
+    assert preprocessing.batched_nms(boxes, scores, 0.45).tolist() == expected.tolist()
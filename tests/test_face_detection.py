@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from src.ai_module import AI  # noqa: E402
+
+
+class FakeServer:
+    """Answers FaceDetection like the model server: `[{"bbox": boxes}]` for
+    one frame, one `{"bbox": boxes}` per part for a multipart batch"""
+
+    def __init__(self, batches: bool) -> None:
+        self.batches = batches
+        self.requests = []
+
+    def post_json(self, endpoint, url, files=None, data=None):
+        self.requests.append("batch" if files else "single")
+        if files:
+            if not self.batches:
+                # Handler without batch support reads the first part only
+                return [{"bbox": boxes_of(next(iter(files.values())))}]
+            return [{"bbox": boxes_of(image)} for image in files.values()]
+        return [{"bbox": boxes_of(data)}]
+
+
+class Detector:
+    """The FaceDetection calls of AI, without the Qt parent"""
+
+    detect_faces = AI.detect_faces
+    detect_faces_batch = AI.detect_faces_batch
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.unbatched_urls = set()
+
+    def get_url(self, model_name: str) -> str:
+        return f"http://127.0.0.1:8090/predictions/{model_name}"
+
+
+def boxes_of(image: bytes) -> list:
+    return [[len(image), 0, len(image) + 10, 10]]
+
+
+IMAGES = [b"a", b"bb", b"ccc"]
+EXPECTED = [boxes_of(image) for image in IMAGES]
+
+
+def test_single_frame_shape():
+    server = FakeServer(batches=True)
+    assert Detector(server).detect_faces(b"abcd") == boxes_of(b"abcd")
+
+
+def test_batch_shape_one_request():
+    server = FakeServer(batches=True)
+    assert Detector(server).detect_faces_batch(IMAGES) == EXPECTED
+    assert server.requests == ["batch"]
+
+
+def test_unbatched_server_is_remembered():
+    server = FakeServer(batches=False)
+    detector = Detector(server)
+    assert detector.detect_faces_batch(IMAGES) == EXPECTED
+    assert server.requests == ["batch"] + ["single"] * len(IMAGES)
+
+    server.requests.clear()
+    assert detector.detect_faces_batch(IMAGES) == EXPECTED
+    assert server.requests == ["single"] * len(IMAGES)
+
+
+def test_unreachable_server_is_not_remembered():
+    class Down:
+        def post_json(self, *args, **kwargs):
+            return None
+
+    detector = Detector(Down())
+    assert detector.detect_faces_batch(IMAGES) == [[], [], []]
+    assert not detector.unbatched_urls
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.face_index import FaceIdentityIndex, Hit, LocalCollection, search_faces
+
+
+class BruteForceCollection:
+    """Milvus collection answering `search` and `query` by scanning every row"""
+
+    def __init__(self, ids, vectors) -> None:
+        self.ids = list(ids)
+        self.vectors = np.asarray(vectors, np.float64)
+        self.schema = SimpleNamespace(primary_field=SimpleNamespace(name="face_id"))
+
+    def search(self, data, anns_field, param, limit=10, output_fields=None, **kwargs):
+        assert param["metric_type"] == "L2"
+        results = []
+        for query in np.asarray(data, np.float64):
+            dist = ((self.vectors - query) ** 2).sum(axis=1)
+            order = np.argsort(dist, kind="stable")[:limit]
+            results.append([Hit(self.ids[i], float(dist[i])) for i in order])
+        return results
+
+    def query(self, expr, output_fields, offset, limit):
+        return [
+            {"face_id": i, "face_vector": v.tolist()}
+            for i, v in zip(self.ids[offset:offset + limit], self.vectors[offset:offset + limit])
+        ]
+
+
+@pytest.fixture
+def faces():
+    rng = np.random.default_rng(0)
+    ids = list(range(100, 100 + 500))
+    vectors = rng.normal(size=(len(ids), 128)).astype(np.float32)
+    queries = np.concatenate([
+        vectors[rng.choice(len(ids), 20)] + rng.normal(scale=0.05, size=(20, 128)),
+        rng.normal(size=(20, 128)),
+    ]).astype(np.float32)
+    return ids, vectors, queries
+
+
+def test_local_search_matches_milvus(faces):
+    ids, vectors, queries = faces
+    index = FaceIdentityIndex()
+    index.build(ids, vectors)
+
+    expected = search_faces(BruteForceCollection(ids, vectors), queries)
+    local = search_faces(LocalCollection(index), queries)
+    assert [i for i, _ in local] == [i for i, _ in expected]
+    np.testing.assert_allclose([d for _, d in local], [d for _, d in expected], rtol=1e-4, atol=1e-3)
+
+    found, distances = index.search(queries)
+    assert list(found[:, 0]) == [i for i, _ in expected]
+    np.testing.assert_allclose(distances[:, 0], [d for _, d in expected], rtol=1e-4, atol=1e-3)
+
+
+def test_k_nearest_are_sorted(faces):
+    ids, vectors, queries = faces
+    index = FaceIdentityIndex()
+    index.build(ids, vectors)
+
+    found, distances = index.search(queries, k=5)
+    expected = BruteForceCollection(ids, vectors).search(queries, "face_vector", {"metric_type": "L2"}, limit=5)
+    assert found.tolist() == [[str(hit.id) for hit in hits] for hits in expected]
+    assert np.all(np.diff(distances, axis=1) >= 0)
+
+
+def test_sync_pages_through_collection(faces):
+    ids, vectors, queries = faces
+    index = FaceIdentityIndex(page_size=64)
+    index.sync(BruteForceCollection(ids, vectors))
+    assert len(index) == len(ids)
+    assert search_faces(LocalCollection(index), queries) == search_faces(LocalCollection(_built(ids, vectors)), queries)
+
+
+def test_empty_index():
+    index = FaceIdentityIndex()
+    assert not index.ready
+    assert search_faces(LocalCollection(index), np.zeros((2, 4))) == [(None, float("inf"))] * 2
+
+
+def _built(ids, vectors) -> FaceIdentityIndex:
+    index = FaceIdentityIndex()
+    index.build(ids, vectors)
+    return index
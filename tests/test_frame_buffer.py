@@ -0,0 +1,160 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.frame_buffer import FrameRingBuffer
+
+SHAPE = (4, 6, 3)
+
+
+def write(buffer, value, shape=SHAPE):
+    slot = buffer.begin_write(shape)
+    slot.frame[...] = value
+    return buffer.commit_write(slot, {"value": value})
+
+
+def test_needs_two_slots():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(1)
+
+
+def test_empty_buffer_has_no_frame():
+    assert FrameRingBuffer().acquire_latest() is None
+
+
+def test_newest_frame_wins():
+    buffer = FrameRingBuffer(3)
+    for value in range(1, 6):
+        seq = write(buffer, value)
+
+    slot = buffer.acquire_latest()
+    assert slot.seq == seq == 5
+    assert slot.data == {"value": 5}
+    assert (slot.frame == 5).all()
+    buffer.release(slot)
+
+    # Nothing newer than what was read
+    assert buffer.acquire_latest(slot.seq) is None
+    write(buffer, 6)
+    slot = buffer.acquire_latest(slot.seq)
+    assert slot.seq == 6 and (slot.frame == 6).all()
+    buffer.release(slot)
+
+
+def test_stats_count_dropped_and_read_frames():
+    buffer = FrameRingBuffer(3)
+    for value in range(3):
+        write(buffer, value)
+    # The first two frames were lapped before anyone read them
+    assert buffer.stats() == {"written": 3, "read": 0, "dropped": 2, "slots": 3}
+
+    slot = buffer.acquire_latest()
+    buffer.release(slot)
+    write(buffer, 3)
+    # The frame that was read is not dropped when it gets replaced
+    assert buffer.stats() == {"written": 4, "read": 1, "dropped": 2, "slots": 3}
+
+    write(buffer, 4)
+    assert buffer.stats()["dropped"] == 3
+
+
+def test_begin_write_skips_pinned_slots():
+    buffer = FrameRingBuffer(3)
+    write(buffer, 1)
+    pinned = buffer.acquire_latest()
+
+    for value in range(2, 10):
+        slot = buffer.begin_write(SHAPE)
+        assert slot is not pinned
+        slot.frame[...] = value
+        buffer.commit_write(slot)
+    # The reader's view was never overwritten
+    assert (pinned.frame == 1).all() and pinned.data == {"value": 1}
+
+    buffer.release(pinned)
+    assert pinned.readers == 0
+    assert any(buffer.begin_write(SHAPE) is pinned for _ in range(3))
+
+
+def test_begin_write_grows_when_every_slot_is_pinned():
+    buffer = FrameRingBuffer(2)
+    write(buffer, 1)
+    first = buffer.acquire_latest()
+    write(buffer, 2)
+    second = buffer.acquire_latest(first.seq)
+
+    slot = buffer.begin_write(SHAPE)
+    assert slot is not first and slot is not second
+    assert buffer.stats()["slots"] == 3
+    buffer.release(first)
+    buffer.release(second)
+
+
+def test_resolution_change_reallocates_slots():
+    buffer = FrameRingBuffer(3)
+    write(buffer, 1)
+    old = buffer.acquire_latest()
+
+    # A slot handed out before the change is not published after it
+    stale = buffer.begin_write(SHAPE)
+    seq = write(buffer, 2, shape=(8, 10, 3))
+    buffer.commit_write(stale)
+
+    slot = buffer.acquire_latest(old.seq)
+    assert slot.frame.shape == (8, 10, 3)
+    assert slot.seq == seq and (slot.frame == 2).all()
+    # The reader keeps its array from before the change
+    assert old.frame.shape == SHAPE and (old.frame == 1).all()
+    buffer.release(old)
+    buffer.release(slot)
+    assert all(buffer.begin_write((8, 10, 3)).frame.shape == (8, 10, 3) for _ in range(3))
+
+
+def test_reset_while_slot_is_acquired():
+    buffer = FrameRingBuffer(3)
+    write(buffer, 1)
+    slot = buffer.acquire_latest()
+
+    buffer.reset()
+    assert buffer.acquire_latest() is None
+    # The reader's slot stays pinned until it is released
+    assert all(buffer.begin_write(SHAPE) is not slot for _ in range(3))
+    assert (slot.frame == 1).all()
+    buffer.release(slot)
+    buffer.release(slot)
+    assert slot.readers == 0
+
+    seq = write(buffer, 2)
+    slot = buffer.acquire_latest()
+    assert slot.seq == seq and (slot.frame == 2).all()
+    buffer.release(slot)
+
+
+def test_reader_never_sees_a_torn_frame():
+    buffer = FrameRingBuffer(3)
+    frames = 2000
+    done = threading.Event()
+
+    def writer():
+        for value in range(1, frames + 1):
+            write(buffer, value % 256)
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    last_seq = 0
+    while not done.is_set() or last_seq < frames:
+        slot = buffer.acquire_latest(last_seq)
+        if slot is None:
+            continue
+        assert slot.seq > last_seq
+        value = slot.data["value"]
+        assert (slot.frame == value).all()
+        last_seq = slot.seq
+        buffer.release(slot)
+    thread.join()
+
+    stats = buffer.stats()
+    assert stats["written"] == frames
+    assert stats["read"] + stats["dropped"] == frames
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from core import iou
+
+cython_bbox = pytest.importorskip("cython_bbox")
+
+
+def reference(boxes, query_boxes):
+    return cython_bbox.bbox_overlaps(np.ascontiguousarray(boxes, dtype=np.float64).reshape(-1, 4),
+                                     np.ascontiguousarray(query_boxes, dtype=np.float64).reshape(-1, 4))
+
+
+def random_boxes(n, rng):
+    xy = rng.uniform(0, 1000, size=(n, 2))
+    wh = rng.uniform(0, 100, size=(n, 2))
+    return np.c_[xy, xy + wh]
+
+
+BOX = [10., 20., 29., 59.]
+
+CASES = {
+    "identical": ([BOX], [BOX]),
+    # Inclusive pixel ranges: sharing column 29 overlaps, starting at 30 touches
+    "one pixel overlap": ([BOX], [[29., 20., 48., 59.]]),
+    "touching": ([BOX], [[30., 20., 49., 59.], [10., 60., 29., 99.]]),
+    "nested": ([BOX], [[12., 25., 20., 40.], [0., 0., 100., 100.]]),
+    "single pixel": ([[5., 5., 5., 5.]], [[5., 5., 5., 5.], [5., 5., 6., 6.], BOX]),
+    "zero area": ([[5., 5., 4., 4.], [5., 5., 4., 30.]], [BOX, [5., 5., 4., 4.]]),
+    "disjoint": ([BOX], [[500., 500., 600., 600.]]),
+    "empty boxes": (np.zeros((0, 4)), [BOX]),
+    "empty queries": ([BOX, BOX], np.zeros((0, 4))),
+    "both empty": (np.zeros((0, 4)), np.zeros((0, 4))),
+}
+
+
+def backends():
+    return {name: fn for name, fn in iou.available_backends().items() if name != "cython_bbox"}
+
+
+@pytest.mark.parametrize("name", sorted(backends()))
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_edge_cases_match_cython_bbox(name, case):
+    boxes, query_boxes = CASES[case]
+    got = backends()[name](np.asarray(boxes, dtype=np.float64), np.asarray(query_boxes, dtype=np.float64))
+    expected = reference(boxes, query_boxes)
+    assert got.shape == expected.shape == (len(boxes), len(query_boxes))
+    assert got.dtype == np.float64
+    np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("name", sorted(backends()))
+def test_random_boxes_match_cython_bbox(name):
+    rng = np.random.default_rng(0)
+    for n, k in ((1, 1), (37, 53), (300, 200)):
+        boxes, query_boxes = random_boxes(n, rng), random_boxes(k, rng)
+        np.testing.assert_allclose(backends()[name](boxes, query_boxes), reference(boxes, query_boxes),
+                                   rtol=0, atol=1e-12)
+
+
+def test_selected_backend_is_available():
+    assert iou.BACKEND in iou.available_backends()
@@ -0,0 +1,39 @@
+import lap
+import numpy as np
+import pytest
+
+from core import matching
+
+
+def dense_assignment(cost_matrix, thresh):
+    _, x, _ = lap.lapjv(cost_matrix, extend_cost=True, cost_limit=thresh)
+    return np.asarray([[ix, mx] for ix, mx in enumerate(x) if mx >= 0], dtype=int).reshape(-1, 2)
+
+
+def total(cost_matrix, matches):
+    return cost_matrix[matches[:, 0], matches[:, 1]].sum() if len(matches) else 0.0
+
+
+@pytest.mark.parametrize("min_size", [0, matching.SPLIT_MIN_SIZE])
+@pytest.mark.parametrize("shape,density", [((1, 1), 1.0), ((30, 20), 0.05), ((60, 80), 0.2), ((50, 50), 1.0), ((40, 40), 0.0)])
+def test_same_matching_as_dense_lapjv(monkeypatch, min_size, shape, density):
+    monkeypatch.setattr(matching, "SPLIT_MIN_SIZE", min_size)
+    rng = np.random.default_rng(shape[0] * 100 + shape[1])
+    thresh = 0.8
+    for _ in range(10):
+        cost = rng.uniform(0, 1, size=shape)
+        # Entries above the threshold can never be matched
+        cost[rng.random(shape) > density] = 1.0
+        cost[cost > thresh] = 1.0
+        expected = dense_assignment(cost, thresh)
+
+        matches, unmatched_a, unmatched_b = matching.linear_assignment(cost, thresh)
+        assert len(matches) == len(expected)
+        assert np.isclose(total(cost, matches), total(cost, expected))
+        assert sorted(set(range(shape[0])) - set(matches[:, 0])) == sorted(unmatched_a)
+        assert sorted(set(range(shape[1])) - set(matches[:, 1])) == sorted(unmatched_b)
+
+
+def test_empty_matrix():
+    matches, unmatched_a, unmatched_b = matching.linear_assignment(np.empty((3, 0)), 0.8)
+    assert len(matches) == 0 and tuple(unmatched_a) == (0, 1, 2) and tuple(unmatched_b) == ()
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from deep_sort import linear_assignment
+
+
+def level_cascade(distance_metric, max_distance, cascade_depth, tracks, detections,
+                  track_indices=None, detection_indices=None):
+    """Reference cascade: a cost matrix and a solve for every level"""
+    if track_indices is None:
+        track_indices = list(range(len(tracks)))
+    if detection_indices is None:
+        detection_indices = list(range(len(detections)))
+
+    unmatched_detections = detection_indices
+    matches = []
+    for level in range(cascade_depth):
+        if len(unmatched_detections) == 0:
+            break
+        track_indices_l = [k for k in track_indices if tracks[k].time_since_update == 1 + level]
+        if len(track_indices_l) == 0:
+            continue
+        matches_l, _, unmatched_detections = linear_assignment.min_cost_matching(
+            distance_metric, max_distance, tracks, detections, track_indices_l, unmatched_detections)
+        matches += matches_l
+    unmatched_tracks = list(set(track_indices) - set(k for k, _ in matches))
+    return matches, unmatched_tracks, unmatched_detections
+
+
+def random_problem(rng, n_tracks, n_detections, cascade_depth):
+    # Ages past the cascade depth and 0 (just updated) are left out of the cascade
+    tracks = [SimpleNamespace(time_since_update=int(age))
+              for age in rng.integers(0, cascade_depth + 3, size=n_tracks)]
+    detections = list(range(n_detections))
+    costs = rng.random((n_tracks, n_detections))
+    calls = []
+
+    def distance_metric(tracks, detections, track_indices, detection_indices):
+        calls.append((list(track_indices), list(detection_indices)))
+        return costs[np.ix_(track_indices, detection_indices)]
+
+    return tracks, detections, distance_metric, calls
+
+
+@pytest.mark.parametrize("n_tracks,n_detections", [(0, 5), (5, 0), (1, 1), (8, 3), (20, 20), (40, 25), (120, 150)])
+def test_same_result_as_level_loop(n_tracks, n_detections):
+    rng = np.random.default_rng(n_tracks * 1000 + n_detections)
+    for trial in range(20):
+        cascade_depth = int(rng.integers(1, 8))
+        tracks, detections, distance_metric, _ = random_problem(rng, n_tracks, n_detections, cascade_depth)
+        max_distance = float(rng.uniform(0.1, 0.9))
+        args = (distance_metric, max_distance, cascade_depth, tracks, detections)
+
+        expected = level_cascade(*args)
+        result = linear_assignment.matching_cascade(*args)
+        assert result[0] == expected[0]
+        assert sorted(result[1]) == sorted(expected[1])
+        assert result[2] == expected[2]
+
+
+def test_subset_of_tracks_and_detections():
+    rng = np.random.default_rng(1)
+    tracks, detections, distance_metric, _ = random_problem(rng, 30, 30, 5)
+    track_indices = [k for k in range(30) if k % 3]
+    detection_indices = [k for k in range(30) if k % 4]
+    args = (distance_metric, 0.5, 5, tracks, detections, track_indices, detection_indices)
+
+    expected = level_cascade(*args)
+    result = linear_assignment.matching_cascade(*args)
+    assert result[0] == expected[0]
+    assert sorted(result[1]) == sorted(expected[1])
+    assert result[2] == expected[2]
+
+
+def test_at_most_two_cost_matrices():
+    rng = np.random.default_rng(2)
+    tracks, detections, distance_metric, calls = random_problem(rng, 60, 40, 10)
+    linear_assignment.matching_cascade(distance_metric, 0.7, 10, tracks, detections)
+    assert 1 <= len(calls) <= 2
+    if len(calls) == 2:
+        # Deeper levels are only compared with what the first level left
+        first_rows, first_cols = calls[0]
+        assert set(calls[1][1]) <= set(first_cols)
+        assert not set(calls[1][0]) & set(first_rows)
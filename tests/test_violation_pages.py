@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.violation_pages import ViolationPager, documents_to_frame, search_filter
+from tests.memory_mongo import MemoryCollection, violation_documents
+
+FROM_TIME, TO_TIME = "2024-01-03T00:00:00.000", "2024-01-20T23:59:59.999"
+
+
+@pytest.fixture
+def documents():
+    return violation_documents(3000, np.random.default_rng(0))
+
+
+def expected_frame(documents, keep=lambda d: True):
+    rows = [d for d in documents if FROM_TIME <= d["time"] <= TO_TIME and keep(d)]
+    return documents_to_frame(sorted(rows, key=lambda d: (d["time"], d["_id"])))
+
+
+def read_all(pager):
+    ids = []
+    for row in range(pager.count()):
+        page, offset = pager.locate(row)
+        ids.append(page.index[offset])
+    return ids
+
+
+def test_rows_in_key_order(documents):
+    pager = ViolationPager(MemoryCollection(documents), FROM_TIME, TO_TIME, page_size=50)
+    expected = expected_frame(documents)
+    try:
+        assert pager.count() == len(expected)
+        # Backwards, so every page start is looked up from an unread page
+        for row in reversed(range(0, len(expected), 37)):
+            page, offset = pager.locate(row)
+            assert page.iloc[offset].tolist() == expected.iloc[row].tolist()
+            assert page.index[offset] == expected.index[row]
+    finally:
+        pager.close()
+
+
+@pytest.mark.parametrize("column,text,keep", [
+    ("location", "CAM03", lambda d: "CAM03" in d["location"]),
+    ("type", "chiều", lambda d: "chiều" in d["type"]),
+    ("speed", "9", lambda d: "9" in str(d["speed"])),
+    ("speed", "10", lambda d: "10" in str(d["speed"])),
+    ("time", "2024-01-05T1", lambda d: "2024-01-05T1" in d["time"]),
+])
+def test_search_in_mongo_filter(documents, column, text, keep):
+    pager = ViolationPager(MemoryCollection(documents), FROM_TIME, TO_TIME,
+                           search=search_filter(column, text), page_size=50)
+    expected = expected_frame(documents, keep)
+    try:
+        assert 0 < pager.count() == len(expected)
+        assert read_all(pager) == expected.index.tolist()
+    finally:
+        pager.close()
+
+
+def test_empty_search():
+    assert search_filter("location", "") is None
+    assert search_filter("location", "CAM.1") == {"location": {"$regex": r"CAM\.1"}}
+
+
+def test_request_loads_in_background(documents):
+    pager = ViolationPager(MemoryCollection(documents), FROM_TIME, TO_TIME, page_size=50)
+    expected = expected_frame(documents)
+    try:
+        assert pager.cached(3) is None
+        rows = pager.request(3).result(5)
+        assert rows.index.tolist() == expected.index[150:200].tolist()
+        assert pager.cached(3) is rows
+        assert pager.request(3).result() is rows
+    finally:
+        pager.close()
+
+
+def test_failed_load_backs_off(documents):
+    class Down(MemoryCollection):
+        def find(self, *args, **kwargs):
+            self.queries += 1
+            raise ConnectionError("server selection timeout")
+
+    collection = Down(documents)
+    pager = ViolationPager(collection, FROM_TIME, TO_TIME, retry_interval=60)
+    try:
+        with pytest.raises(ConnectionError):
+            pager.request(0).result(5)
+        queries = collection.queries
+        # Every paint asks again, none of them queries MongoDB until the interval passed
+        assert all(pager.request(0) is None for _ in range(100))
+        assert collection.queries == queries
+
+        pager.retry_interval = 0
+        with pytest.raises(ConnectionError):
+            pager.request(0).result(5)
+        assert collection.queries == queries + 1
+    finally:
+        pager.close()
+
+
+def test_count_on_pager_thread(documents):
+    pager = ViolationPager(MemoryCollection(documents), FROM_TIME, TO_TIME)
+    try:
+        assert pager.count_async().result() == len(expected_frame(documents))
+    finally:
+        pager.close()
+
+
+def test_page_loaded_once_while_prefetched(documents):
+    class Gated(MemoryCollection):
+        gate = threading.Event()
+
+        def find(self, *args, **kwargs):
+            self.gate.wait(5)
+            return super().find(*args, **kwargs)
+
+    pager = ViolationPager(Gated(documents), FROM_TIME, TO_TIME, page_size=50)
+    pager.total = len(expected_frame(documents))
+    loads = []
+    load = pager._load
+    pager._load = lambda page: loads.append(page) or load(page)
+
+    reader = threading.Thread(target=pager.page, args=(1,))
+    reader.start()
+    for _ in range(500):
+        if 1 in pager._pending:
+            break
+        threading.Event().wait(0.01)
+    # A prefetch of the page being read does not query it again
+    pager._prefetch(1)
+    Gated.gate.set()
+    reader.join(5)
+    pager.executor.shutdown(wait=True)
+
+    assert loads.count(1) == 1
+    assert loads.count(2) == 1
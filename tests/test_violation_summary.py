@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+pytest.importorskip("xarray")
+
+from src.query import violation_summary  # noqa: E402
+from src.query_thread import process_data, process_summary  # noqa: E402
+from src.violation_pages import VIOLATION_COLUMNS, documents_to_frame  # noqa: E402
+from tests.memory_mongo import MemoryCollection, violation_documents  # noqa: E402
+
+
+@pytest.mark.parametrize("seed,n,from_time,to_time", [
+    (0, 3000, "2024-01-03T00:00:00.000", "2024-01-20T23:59:59.999"),
+    (1, 500, "2024-01-01T00:00:00.000", "2024-01-31T23:59:59.999"),
+    # Bounds falling inside an hour and a day
+    (2, 2000, "2024-01-10T06:30:00.000", "2024-01-12T18:15:00.000"),
+])
+def test_summary_same_charts_as_pandas(seed, n, from_time, to_time):
+    documents = violation_documents(n, np.random.default_rng(seed))
+    for document in documents[::13]:
+        # Some violations were stored without a location
+        del document["location"]
+    collection = MemoryCollection(documents)
+
+    raw = collection.find({"time": {"$gte": from_time, "$lte": to_time}}, dict.fromkeys(VIOLATION_COLUMNS, 1))
+    expected = process_data(documents_to_frame(list(raw)))
+    got = process_summary(next(collection.aggregate(violation_summary(from_time, to_time))))
+
+    pd.testing.assert_frame_equal(got[0], expected[0], check_dtype=False)
+    pd.testing.assert_series_equal(got[1].sort_index(), expected[1].sort_index(), check_names=False)
+    assert got[1].is_monotonic_decreasing
+    pd.testing.assert_series_equal(got[2], expected[2], check_names=False)
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from PyQt5 import QtCore  # noqa: E402
+
+from src.pandasmodel import ViolationCursorModel  # noqa: E402
+from src.violation_pages import VIOLATION_COLUMNS, ViolationPager  # noqa: E402
+from tests.memory_mongo import MemoryCollection, violation_documents  # noqa: E402
+
+FROM_TIME, TO_TIME = "2024-01-03T00:00:00.000", "2024-01-20T23:59:59.999"
+LOCATION = VIOLATION_COLUMNS.index("location")
+
+
+@pytest.fixture(scope="module")
+def app():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def wait_for(app, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+class RecordingCollection(MemoryCollection):
+    """Remembers the threads that queried it"""
+
+    def __init__(self, documents, fail=False):
+        super().__init__(documents)
+        self.fail = fail
+        self.threads = []
+
+    def find(self, *args, **kwargs):
+        self.threads.append(threading.current_thread())
+        if self.fail:
+            raise ConnectionError("server selection timeout")
+        return super().find(*args, **kwargs)
+
+
+def cursor_model(app, collection):
+    model = ViolationCursorModel(ViolationPager(collection, FROM_TIME, TO_TIME, page_size=50))
+    wait_for(app, lambda: model.rowCount() > 0)
+    return model
+
+
+def test_pages_load_off_the_gui_thread(app):
+    documents = violation_documents(2000, np.random.default_rng(0))
+    collection = RecordingCollection(documents)
+    model = cursor_model(app, collection)
+    changed = []
+    model.dataChanged.connect(lambda top, bottom: changed.append((top.row(), bottom.row())))
+    try:
+        row = 175
+        index = model.index(row, LOCATION)
+        assert model.data(index) == "..."
+        wait_for(app, lambda: (150, 199) in changed)
+
+        expected = sorted((d for d in documents if FROM_TIME <= d["time"] <= TO_TIME),
+                          key=lambda d: (d["time"], d["_id"]))
+        assert model.data(index) == expected[row]["location"]
+        assert model.image_path(row) == expected[row]["path"]
+        assert collection.threads and threading.main_thread() not in collection.threads
+    finally:
+        model.pager.close()
+
+
+def test_failed_page_reported_once(app):
+    documents = violation_documents(500, np.random.default_rng(1))
+    collection = RecordingCollection(documents)
+    model = cursor_model(app, collection)
+    errors = []
+    model.error.connect(errors.append)
+    collection.fail = True
+    try:
+        index = model.index(0, LOCATION)
+        assert model.data(index) == "..."
+        wait_for(app, lambda: errors)
+        queries = len(collection.threads)
+
+        # Painting the table again does not retry until the pager's retry_interval
+        for row in range(50):
+            assert model.data(model.index(row, LOCATION)) == "..."
+        app.processEvents()
+        assert len(collection.threads) == queries
+        assert errors == ["Lỗi kết nối tới CSDL!"]
+    finally:
+        model.pager.close()